@@ -1,66 +1,61 @@
 from typing import Dict, List
+from dataclasses import dataclass, field
 from datetime import datetime
-import unicodedata
-import smtplib
-from backend.config import GMAIL_SENDER, GMAIL_PASSWD, ALERT_RECIPIENT
 from backend.logger import logger
+from backend.outbox import outbox, dispatcher
 
-def find_new_jobs_for_site(site: str, jobs: List[Dict], seen_store: Dict[str, List[Dict]]) -> List[Dict]:
+@dataclass
+class SiteDiff:
+    """Result of comparing one site's fresh scrape against its seen jobs."""
+    site: str
+    added: List[Dict] = field(default_factory=list)
+    updated: List[Dict] = field(default_factory=list)
+    removed: List[Dict] = field(default_factory=list)
+    current: List[Dict] = field(default_factory=list)  # the site's seen jobs after this check
+
+
+def diff_jobs_for_site(site: str, jobs: List[Dict], seen_jobs: List[Dict]) -> SiteDiff:
     """
     Compare freshly scraped jobs with those already seen for this site.
     - Adds new jobs.
     - Updates changed jobs.
     - Removes stale jobs (no longer present on the site).
-    Returns: list of *new* jobs (for alerting).
     """
-    seen_jobs = seen_store.get(site, [])
     seen_by_link = {j.get("link"): j for j in seen_jobs if "link" in j}
     scraped_by_link = {j.get("link"): j for j in jobs if j.get("link")}
 
-    new_jobs = []
-    updated_seen = {}
+    diff = SiteDiff(site=site)
 
     for link, job in scraped_by_link.items():
         if link not in seen_by_link:
-            new_jobs.append(job)
-            updated_seen[link] = job
+            diff.added.append(job)
         else:
             old_job = seen_by_link[link]
             if job != old_job:
                 logger.debug(f"Job updated for {site}: {job.get('title', '')} ({link})")
-            updated_seen[link] = job  # store updated info
-
-    stale_links = set(seen_by_link.keys()) - set(scraped_by_link.keys())
-    if stale_links:
-        for link in stale_links:
-            logger.info(f"[{site}] Removing stale job: {seen_by_link[link].get('title', link)}")
+                diff.updated.append(job)
+        diff.current.append(job)  # store updated info
 
-    seen_store[site] = list(updated_seen.values())
+    for link, job in seen_by_link.items():
+        if link not in scraped_by_link:
+            logger.info(f"[{site}] Removing stale job: {job.get('title', link)}")
+            diff.removed.append(job)
 
-    return new_jobs
+    return diff
 
 
-def emailer(recpt, subject, mesg):
-    def to_ascii(s: str) -> str:
-        return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+def find_new_jobs_for_site(site: str, jobs: List[Dict], seen_store: Dict[str, List[Dict]]) -> List[Dict]:
+    """
+    Diff a site against seen_store and update seen_store in place.
+    Returns: list of *new* jobs (for alerting).
+    """
+    diff = diff_jobs_for_site(site, jobs, seen_store.get(site, []))
+    seen_store[site] = diff.current
+    return diff.added
 
-    TO = to_ascii(recpt)
-    BODY = f"To: {TO}\r\nFrom: {GMAIL_SENDER}\r\nSubject: {to_ascii(subject)}\r\n{to_ascii(mesg)}"
-    try:
-        server = smtplib.SMTP('smtp.gmail.com', 587, timeout=30)
-        server.starttls()
-        server.login(GMAIL_SENDER, GMAIL_PASSWD)
-        server.sendmail(GMAIL_SENDER, TO, BODY)
-        logger.debug(f"Email sent to {ALERT_RECIPIENT}")
-    except Exception as e:
-        logger.exception(f"Error sending email: {e}")
-    finally:
-        try:
-            server.quit()
-        except Exception:
-            pass
 
 def alert(all_new: Dict[str, List[Dict]]):
+    """Queue a summary of the new jobs in the alert outbox; delivery happens in the background."""
     if not any(all_new.values()):
         logger.debug("No new jobs to email.")
         return
@@ -76,5 +71,10 @@ def alert(all_new: Dict[str, List[Dict]]):
         lines.append("")
     message = "\n".join(lines)
     subject = f"Job Alert ({total_new} new job{'s' if total_new != 1 else ''}) - {timestamp}"
-    emailer(ALERT_RECIPIENT, subject, message)
-    logger.info(f"[Email] Sent with {total_new} total new jobs.")
+    if not dispatcher.sinks:
+        logger.info(f"[Alerts] No alert sinks configured; not sending {total_new} new jobs")
+        return
+    payload = {"total_new": total_new, "new_jobs": {site: jobs for site, jobs in all_new.items() if jobs}}
+    queued = outbox.enqueue(subject, message, payload, dispatcher.sinks)
+    dispatcher.wake()
+    logger.info(f"[Alerts] Queued alert with {total_new} total new jobs for {queued} sink(s).")
@@ -1,32 +1,294 @@
 #!/usr/bin/env python3
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse, PlainTextResponse, FileResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, FileResponse, Response, StreamingResponse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import json
+import random
+from typing import Optional
 import time
 import uvicorn
 import redis
+import redis.asyncio
+from redis.exceptions import LockError
 import os
 from datetime import datetime
 from loguru import logger
 from fastapi.middleware.cors import CORSMiddleware
 # Prometheus metrics
 from prometheus_fastapi_instrumentator import Instrumentator
-from prometheus_client import Counter, Histogram, REGISTRY
 # run_check_once
-from backend.core import run_check_once
-from backend.config import DATA_FILE, LOG_FILE
+from backend.core import run_check_once, scrape_all
+from backend.metrics import scrape_counter, scrape_duration
+from backend.state import state_store
+from backend.cache import single_flight
+from backend.views import (
+    build_views, publish_views, read_view, read_view_async, current_version_async, brotli,
+)
+from backend.search import JobIndex, InvalidQuery, build_index, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.logtail import LogFilter, LogFollower, tail
+from backend.changes import ChangeFeed, RESET, change_event, events_since, publish_changes
+from backend.outbox import dispatcher
+from backend.scrape_queue import ScrapeQueue, scrape_distributed
+from backend.config import (
+    LOG_FILE, SCRAPE_SCHEDULER_ENABLED, SCRAPE_INTERVAL_SECONDS, SCRAPE_JITTER_SECONDS,
+    REDIS_HOST, REDIS_PORT, SCRAPE_MODE,
+)
 
 # Redis config
-REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
-REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
-JOBS_CACHE_KEY = "jobs_cache"
-TOP_JOBS_CACHE_KEY = "top_jobs_cache"
-STATS_CACHE_KEY = "stats_cache"
-CACHE_TTL_SECONDS = 30 * 60  # 30 minutes
-
+SCRAPE_LOCK_KEY = "lock:scrape"
+SCRAPE_LOCK_LEASE_SECONDS = 15 * 60
+LAST_SCRAPE_KEY = "scrape:last"  # shared, so any replica that rebuilds the stats view reports it
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT_SECONDS = 5  # how long a request waits for a free connection
+# Threads for blocking work done for requests: view rebuilds, index builds, file reads
+API_BLOCKING_WORKERS = int(os.getenv("API_BLOCKING_WORKERS", 4))
+MAX_LOG_LINES = 10000
+LOG_STREAM_POLL_SECONDS = 1.0
+LOG_STREAM_KEEPALIVE_SECONDS = 15.0
+CHANGES_KEEPALIVE_SECONDS = 15.0
+
+# Sync clients for the scrape thread (scrape lease, publishing) and single-flight rebuilds
 r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+# Views are stored as raw bytes (JSON body, gzip/brotli copies), so they need an undecoded client
+r_views = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=False)
+# Request handlers read views through a bounded async pool and never block the event loop
+r_views_async = redis.asyncio.Redis(connection_pool=redis.asyncio.BlockingConnectionPool(
+    host=REDIS_HOST, port=REDIS_PORT, decode_responses=False,
+    max_connections=REDIS_MAX_CONNECTIONS, timeout=REDIS_POOL_TIMEOUT_SECONDS,
+))
+
+# The change feed's pub/sub subscription holds a connection of its own
+change_feed = ChangeFeed(redis.asyncio.Redis(host=REDIS_HOST, port=REDIS_PORT))
+
+# Per-site tasks for scrape workers, when SCRAPE_MODE is distributed
+scrape_queue = ScrapeQueue(r)
+
+# Checks get a thread of their own, so a long scrape never holds up request work
+scrape_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scrape")
+blocking_executor = ThreadPoolExecutor(max_workers=API_BLOCKING_WORKERS, thread_name_prefix="api-blocking")
+
+# In-memory search index over the jobs view, rebuilt when a new views version appears
+_job_index: Optional[JobIndex] = None
+_job_index_lock = asyncio.Lock()
+
+last_scrape_time = None  # global variable to store last scrape
+
+
+def refresh_jobs():
+    """
+    Run one check and publish the views it produced. Readers keep getting the
+    previous version until the new one is switched in.
+    Only one worker across all replicas scrapes at a time, guarded by a Redis lease.
+    """
+    lock = r.lock(SCRAPE_LOCK_KEY, timeout=SCRAPE_LOCK_LEASE_SECONDS)
+    if not lock.acquire(blocking=False):
+        logger.info("[Scrape] Another worker is already scraping; skipping this run")
+        return
+    try:
+        _refresh_jobs_locked()
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            logger.warning("[Scrape] Scrape outlived its lock lease")
+
+
+def _refresh_jobs_locked():
+    global last_scrape_time
+    logger.info("[Scrape] Running scheduled scrape")
+    start = time.time()
+    result = None
+    try:
+        if SCRAPE_MODE == "distributed":
+            result = run_check_once(lambda scrapers, fingerprints: scrape_distributed(scrape_queue, scrapers, fingerprints))
+        else:
+            result = run_check_once(scrape_all)
+        scrape_counter.inc()
+        last_scrape_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        r.set(LAST_SCRAPE_KEY, last_scrape_time)
+    except Exception as e:
+        logger.exception(f"[Scrape] Error while running scrape: {e}")
+
+    duration = time.time() - start
+    scrape_duration.observe(duration)
+    logger.info(f"[Scrape] finished in {duration:.2f}s")
+
+    if result is None:
+        return
+    views = result.views
+    try:
+        views["stats"].update(scrape_stats())
+        version = publish_views(r_views, views)
+    except Exception as e:
+        logger.exception(f"[Views] Failed to publish views after scrape: {e}")
+        return
+    try:
+        publish_changes(r, change_event(version, result.diffs, views["stats"]))
+    except Exception as e:
+        logger.exception(f"[Changes] Failed to publish the change feed event: {e}")
 
-app = FastAPI(title="Job Scraper API", version="1.0")
+
+def scrape_stats():
+    """Scrape counters from this process's Prometheus metrics, merged into the stats view."""
+    avg_duration = 0.0
+    for metric in scrape_duration.collect():
+        sum_val = None
+        count_val = None
+        for sample in metric.samples:
+            if sample.name.endswith("_sum"):
+                sum_val = sample.value
+            elif sample.name.endswith("_count"):
+                count_val = sample.value
+        if sum_val is not None and count_val:
+            avg_duration = sum_val / count_val
+
+    last_scrape = last_scrape_time
+    if last_scrape is None:
+        try:
+            last_scrape = r.get(LAST_SCRAPE_KEY)
+        except redis.RedisError:
+            pass
+
+    return {
+        "total_scrapes": int(scrape_counter._value.get()),
+        "scrape_durations_seconds": round(avg_duration, 2),
+        "last_scrape": last_scrape or "N/A"
+    }
+
+
+async def run_blocking(fn, *args):
+    """Run a blocking call on the request executor without stalling the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(blocking_executor, fn, *args)
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """Pick the best stored representation for an Accept-Encoding header."""
+    offered = set()
+    for part in accept_encoding.lower().split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            offered.add(coding)
+    if brotli is not None and "br" in offered:
+        return "br"
+    if "gzip" in offered or "*" in offered:
+        return "gzip"
+    return "identity"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" name the same representation
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
+
+
+async def _load_view(name: str, fields):
+    values = await read_view_async(r_views_async, name, fields)
+    if values is not None:
+        return values
+    return await run_blocking(_rebuild_views, name, fields)
+
+
+def _rebuild_views(name: str, fields):
+    """Redis has no views yet (fresh start or restart): one worker rebuilds them."""
+    with single_flight(r, "views"):
+        values = read_view(r_views, name, fields)
+        if values is None:
+            if not state_store.exists():
+                raise HTTPException(status_code=404, detail="No seen state found")
+            logger.info("[Views] No published views; rebuilding from seen state")
+            views = build_views(state_store.load())
+            views["stats"].update(scrape_stats())
+            publish_views(r_views, views)
+            values = read_view(r_views, name, fields)
+    return values
+
+
+async def job_index() -> JobIndex:
+    """The search index for the current views version, building it on first use."""
+    global _job_index
+    version = await current_version_async(r_views_async)
+    if version is None:
+        await _load_view("jobs", ("etag",))  # publishes views if Redis has none
+        version = await current_version_async(r_views_async)
+    if _job_index is not None and _job_index.version == version:
+        return _job_index
+    async with _job_index_lock:
+        if _job_index is None or _job_index.version != version:
+            values = await read_view_async(r_views_async, "jobs", ("identity",), version=version)
+            if values is None:
+                raise HTTPException(status_code=503, detail="Job list is being republished; retry")
+            _job_index = await run_blocking(build_index, values[0], version)
+            logger.info(f"[Search] Built job index for views version {version} ({len(_job_index.jobs)} jobs)")
+        return _job_index
+
+
+async def serve_view(name: str, request: Request) -> Response:
+    """
+    Return the published view exactly as stored: the precompressed copy the client
+    accepts, with a weak ETag, or 304 if the client already has this version.
+    """
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag, = await _load_view(name, ("etag",))
+        if etag and _etag_matches(if_none_match, etag.decode("ascii")):
+            headers["ETag"] = etag.decode("ascii")
+            return Response(status_code=304, headers=headers)
+
+    coding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    etag, body = await _load_view(name, ("etag", coding))
+    if body is None:
+        # Published by a replica without brotli; every publisher stores identity
+        coding = "identity"
+        etag, body = await _load_view(name, ("etag", coding))
+
+    headers["ETag"] = etag.decode("ascii")
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    logger.info(f"[Views] Returning {name} from published views ({coding})")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def scrape_scheduler():
+    """Refresh state in the background every SCRAPE_INTERVAL_SECONDS (+ jitter)."""
+    # Stagger the first run so replicas started together don't scrape in lockstep
+    await asyncio.sleep(random.uniform(0, SCRAPE_JITTER_SECONDS))
+    while True:
+        await asyncio.get_running_loop().run_in_executor(scrape_executor, refresh_jobs)
+        await asyncio.sleep(SCRAPE_INTERVAL_SECONDS + random.uniform(0, SCRAPE_JITTER_SECONDS))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    dispatcher.start()
+    tasks = [asyncio.create_task(change_feed.run())]
+    if SCRAPE_SCHEDULER_ENABLED:
+        logger.info(f"[Scheduler] Scraping every {SCRAPE_INTERVAL_SECONDS:.0f}s (+ up to {SCRAPE_JITTER_SECONDS:.0f}s jitter)")
+        tasks.append(asyncio.create_task(scrape_scheduler()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        await r_views_async.connection_pool.disconnect()
+        await change_feed.r.aclose()
+        await asyncio.get_running_loop().run_in_executor(blocking_executor, dispatcher.stop)
+
+
+app = FastAPI(title="Job Scraper API", version="1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,171 +303,191 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Prometheus custom metrics
-scrape_counter = Counter("job_scrapes_total", "Total number of scrapes triggered via API")
-scrape_duration = Histogram("job_scrape_duration_seconds", "Duration of job scrapes triggered via API (seconds)")
-last_scrape_time = None  # global variable to store last scrape
-
 # Metrics endpoint
 Instrumentator().instrument(app).expose(app, endpoint="/metrics")
 
 # Healthcheck endpoint
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok", "time": time.strftime("%Y-%m-%d %H:%M:%S")}
 
 # Jobs JSON endpoint
 @app.get("/jobs", response_class=JSONResponse)
-def jobs():
-    """
-    Returns jobs JSON, caching results in Redis for 30 minutes
+async def jobs(
+    request: Request,
+    site: Optional[str] = None,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    title: Optional[str] = None,
+    keyword: Optional[str] = None,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+):
     """
-    global last_scrape_time
-    # Try to get cached data
-    cached = r.get(JOBS_CACHE_KEY)
-    if cached:
-        logger.info("[Cache] Returning jobs from Redis cache")
-        return JSONResponse(content=json.loads(cached))
+    Returns the jobs view published by the last completed check.
+    Scraping happens in the background scheduler and never on this request path.
 
-    # Delete our other cached info so its updates on a scrape
-    r.delete(TOP_JOBS_CACHE_KEY)
-    r.delete(STATS_CACHE_KEY)
+    With any query parameter, returns one page of matching jobs instead:
+    /jobs?site=stripe,plaid&location=new york&keyword=platform&sort=-title&limit=20
+    Follow `next_cursor` with ?cursor=... (plus the same filters) for the next page.
+    """
+    params = (site, category, location, title, keyword, sort, cursor, limit)
+    if all(p is None for p in params):
+        return await serve_view("jobs", request)
 
-    logger.info("[Scrape] No cache found, running scrape")
-    start = time.time()
+    index = await job_index()
     try:
-        run_check_once()
-        scrape_counter.inc()
-        last_scrape_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    except Exception as e:
-        logger.exception(f"[Scrape] Error while running scrape: {e}")
+        # Answered from in-memory indexes in well under a millisecond; fine on the loop
+        result = index.search(
+            site=site, category=category, location=location, title=title, keyword=keyword,
+            sort=sort or "site", cursor=cursor, limit=limit if limit is not None else DEFAULT_PAGE_SIZE,
+        )
+    except InvalidQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(content=result)
 
-    duration = time.time() - start
-    scrape_duration.observe(duration)
-    logger.info(f"[Scrape] finished in {duration:.2f}s")
 
-    if not DATA_FILE.exists():
-        raise HTTPException(status_code=404, detail=f"{DATA_FILE} not found")
+# Change feed endpoint
+@app.get("/changes")
+async def changes(request: Request, since: Optional[int] = None):
+    """
+    Server-Sent Events: one `changes` event per completed check with the jobs each
+    site added, updated and removed (by link) and the new stats, so clients can
+    apply deltas instead of polling /jobs, /top_jobs and /stats. Event ids are
+    views versions: reconnecting with Last-Event-ID (or ?since=) replays what was
+    missed, and a `reset` event means the client must refetch everything.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
 
-    with DATA_FILE.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    async def events():
+        def changes_event(event) -> str:
+            return f"id: {event['version']}\nevent: changes\ndata: {json.dumps(event)}\n\n"
 
-    # Add to cache
-    r.setex(JOBS_CACHE_KEY, CACHE_TTL_SECONDS, json.dumps(data))
-    return JSONResponse(content=data)
+        # Subscribe before reading the backlog so no event falls in between
+        queue = change_feed.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+            replayed = None  # last version sent from the backlog; later duplicates are skipped
+            if since is not None:
+                missed = await events_since(r_views_async, since)
+                if missed is None:
+                    yield "event: reset\ndata: {}\n\n"
+                for event in missed or []:
+                    yield changes_event(event)
+                    replayed = event["version"]
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), CHANGES_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is RESET:
+                    yield "event: reset\ndata: {}\n\n"
+                elif replayed is None or event["version"] > replayed:
+                    yield changes_event(event)
+        finally:
+            change_feed.unsubscribe(queue)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
 
 
 # Top Jobs Endpoint
 @app.get("/top_jobs", response_class=JSONResponse)
-def top_jobs():
-    cached = r.get(TOP_JOBS_CACHE_KEY)
-    if cached:
-        logger.info("[Cache] Returning top jobs from Redis cache")
-        return JSONResponse(content=json.loads(cached))
-
-    KEYWORDS = ["devops", "site reliability", "sre", "platform", "infrastructure"]
-    if not DATA_FILE.exists():
-        raise HTTPException(status_code=404, detail=f"{DATA_FILE} not found")
+async def top_jobs(request: Request):
+    return await serve_view("top_jobs", request)
 
+def _log_filter(level, tag, since, until) -> LogFilter:
     try:
-        with DATA_FILE.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-    except Exception as e:
-        logger.exception(f"[State] Error reading {DATA_FILE}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-    top_jobs_list = []
-
-    for company, jobs_list in data.items():
-        for job in jobs_list:
-            title = job.get("title", "").lower()
-            description = job.get("description", "").lower()
-            matched_keywords = [kw for kw in KEYWORDS if kw in title or kw in description]
-            if matched_keywords:
-                top_jobs_list.append({
-                    "company": company.capitalize(),
-                    "title": job.get("title"),
-                    "location": job.get("location"),
-                    "link": job.get("link"),
-                    "logo": job.get("logo") or f"/logos/{company.lower().replace(' ', '-')}.svg",
-                    "filters": matched_keywords
-                })
-
-    top_jobs_list.sort(key=lambda x: (x["company"].lower(), x["title"].lower()))
-    result = {
-        "count": len(top_jobs_list),
-        "jobs": top_jobs_list,
-        "keywords": KEYWORDS
-    }
+        return LogFilter(level=level, tag=tag, since=since, until=until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    r.setex(TOP_JOBS_CACHE_KEY, CACHE_TTL_SECONDS, json.dumps(result))
-    return JSONResponse(content=result)
 
 # Log endpoint
 @app.get("/logs", response_class=PlainTextResponse)
-def logs(lines: int = 500):
+async def logs(
+    lines: int = Query(500, ge=1, le=MAX_LOG_LINES),
+    level: Optional[str] = None,
+    tag: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
     """
-    Return last N lines of the log file. Example: /logs?lines=200
+    Return the last N lines of the log file, optionally only entries at or above
+    `level`, mentioning a [tag] (comma-separated for several), or within a time range.
+    Example: /logs?lines=200&level=warning&tag=stripe&since=2025-01-01T08:00
     """
+    log_filter = _log_filter(level, tag, since, until)
+    return await run_blocking(_read_log_tail, lines, log_filter)
+
+
+def _read_log_tail(lines: int, log_filter: LogFilter) -> str:
     if not LOG_FILE.exists():
         raise HTTPException(status_code=404, detail=f"{LOG_FILE} not found")
 
     try:
-        with LOG_FILE.open("r", encoding="utf-8") as f:
-            all_lines = f.readlines()
-        return "".join(all_lines[-lines:])
+        return tail(LOG_FILE, lines, log_filter)
     except Exception as e:
         logger.exception(f"[Logs] Error reading log file {LOG_FILE}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@app.get("/logs/stream")
+async def logs_stream(
+    request: Request,
+    lines: int = Query(0, ge=0, le=MAX_LOG_LINES),
+    level: Optional[str] = None,
+    tag: Optional[str] = None,
+):
+    """
+    Server-Sent Events: the last `lines` lines, then every new log line as it is
+    written (same level/tag filters as /logs). Each event holds one or more lines
+    and its id is the file offset, so a reconnecting EventSource resumes where it
+    left off instead of receiving the backlog again.
+    """
+    log_filter = _log_filter(level, tag, None, None)
+    last_event_id = request.headers.get("last-event-id")
+    resume = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    follower = await run_blocking(LogFollower, LOG_FILE, resume, log_filter)
+    backlog = ""
+    if resume is None and lines and LOG_FILE.exists():
+        backlog = await run_blocking(_read_log_tail, lines, log_filter)
+
+    async def events():
+        def event(batch) -> str:
+            data = "".join(f"data: {line}\n" for line in batch)
+            return f"id: {follower.position}\n{data}\n"
+
+        yield "retry: 3000\n\n"
+        if backlog:
+            yield event(backlog.splitlines())
+        idle = 0.0
+        while not await request.is_disconnected():
+            batch = await run_blocking(follower.poll)
+            if batch:
+                idle = 0.0
+                yield event(batch)
+                continue
+            if idle >= LOG_STREAM_KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keepalive\n\n"
+            await asyncio.sleep(LOG_STREAM_POLL_SECONDS)
+            idle += LOG_STREAM_POLL_SECONDS
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
 # Homepage Dashboard endpoint
 @app.get("/stats")
-def stats():
+async def stats(request: Request):
     """
     Returns stats used on the homepage dashboard of the app
     """
-    cached = r.get(STATS_CACHE_KEY)
-    if cached:
-        logger.info("[Cache] Returning stats from Redis cache")
-        return JSONResponse(content=json.loads(cached))
-
-    num_companies = 0
-    total_jobs = 0
-
-    if DATA_FILE.exists():
-        try:
-            with DATA_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                num_companies = len(data.keys())
-                total_jobs = sum(len(v) for v in data.values())
-        except Exception as e:
-            logger.error(f"[State] Failed to read {DATA_FILE}: {e}")
-
-    total_scrapes = int(scrape_counter._value.get())
-
-    avg_duration = 0.0
-    for metric in scrape_duration.collect():
-        sum_val = None
-        count_val = None
-        for sample in metric.samples:
-            if sample.name.endswith("_sum"):
-                sum_val = sample.value
-            elif sample.name.endswith("_count"):
-                count_val = sample.value
-        if sum_val is not None and count_val:
-            avg_duration = sum_val / count_val
-
-    result = {
-        "total_jobs": total_jobs,
-        "companies": num_companies,
-        "total_scrapes": total_scrapes,
-        "scrape_durations_seconds": round(avg_duration, 2),
-        "last_scrape": last_scrape_time or "N/A"
-    }
-
-    # Cache the result
-    r.setex(STATS_CACHE_KEY, CACHE_TTL_SECONDS, json.dumps(result))
-    return JSONResponse(content=result)
+    return await serve_view("stats", request)
 
 if __name__ == "__main__":
     logger.info("[Start] Starting Job Scraper API")
@@ -0,0 +1,182 @@
+"""
+Offline fixtures for the benchmarks: synthetic careers boards of any size, shaped
+like each site's real payload, and a requests transport adapter that replays them
+(or pages recorded with --record) in place of the network.
+"""
+from __future__ import annotations
+import json
+import random
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3 import HTTPResponse
+
+from backend.scrapers.adapters import GreenhouseSource, LeverSource
+
+TITLES = ["Software Engineer", "Site Reliability Engineer", "Platform Engineer", "DevOps Engineer",
+          "Infrastructure Engineer", "Backend Engineer", "Senior Software Engineer", "Staff Engineer",
+          "Product Manager", "Account Executive", "Data Engineer", "Security Engineer", "Software Engineer Intern"]
+LOCATIONS = ["New York, New York, USA", "San Francisco, CA, United States", "Denver, CO", "Seattle, WA",
+             "Boston, MA", "Remote - United States", "London, UK", "Toronto, Canada", "Paris, France"]
+DEPARTMENTS = ["Engineering", "AI, Engineering & Technology", "Security", "Sales", "Product", "Recruiting"]
+META = [("Area - Engineering", "Engineering"), ("Early Career Time Type", "Internship"),
+        ("Cost Center", "Professional Services"), ("Career Page Grouping", "AI, Engineering & Technology"),
+        ("Career Page Grouping", "Security"), ("Cost Center", "Sales")]
+
+# Unrelated page chrome around the listings, as on the real pages
+FILLER = "<div class='nav'><ul>" + "<li><a href='/x'>Link</a><span>text</span></li>" * 40 + "</ul></div>"
+
+
+def _rng(postings: int) -> random.Random:
+    return random.Random(postings)  # same board for the same size, run after run
+
+
+def greenhouse_job(rng: random.Random, i: int) -> Dict:
+    name, value = rng.choice(META)
+    return {
+        "id": i,
+        "title": f"{rng.choice(TITLES)} {i % 97}",
+        "location": {"name": rng.choice(LOCATIONS)},
+        "absolute_url": f"https://boards.greenhouse.io/example/jobs/{1000000 + i}",
+        "updated_at": "2025-01-01T00:00:00-05:00",
+        "metadata": [{"id": 1, "name": name, "value": value, "value_type": "single_select"}],
+    }
+
+
+def greenhouse_jobs(postings: int) -> bytes:
+    rng = _rng(postings)
+    return json.dumps({"jobs": [greenhouse_job(rng, i) for i in range(postings)], "meta": {"total": postings}}).encode()
+
+
+def _departments(postings: int) -> List[Dict]:
+    rng = _rng(postings)
+    departments = [{"id": d, "name": name, "jobs": []} for d, name in enumerate(DEPARTMENTS)]
+    for i in range(postings):
+        rng.choice(departments)["jobs"].append(greenhouse_job(rng, i))
+    return departments
+
+
+def greenhouse_departments(postings: int) -> bytes:
+    return json.dumps({"departments": _departments(postings)}).encode()
+
+
+def databricks_page_data(postings: int) -> bytes:
+    nodes = _departments(postings)
+    return json.dumps({"result": {"pageContext": {"data": {"allGreenhouseDepartment": {"nodes": nodes}}}}}).encode()
+
+
+def atlassian_listings(postings: int) -> bytes:
+    rng = _rng(postings)
+    return json.dumps([{
+        "id": i,
+        "title": f"{rng.choice(TITLES)} {i % 97}",
+        "category": rng.choice(["Engineering", "Interns", "Graduates", "Sales", "Marketing"]),
+        "locations": rng.sample(["San Francisco - United States", "Austin - United States - Remote", "Sydney - Australia", "Remote"], k=rng.randint(1, 2)),
+        "portalJobPost": {"portalUrl": f"https://www.atlassian.com/company/careers/details/{i}"},
+    } for i in range(postings)]).encode()
+
+
+def lever_postings(postings: int) -> bytes:
+    rng = _rng(postings)
+    return json.dumps([{
+        "id": f"{i:08x}",
+        "text": f"{rng.choice(TITLES)} {i % 97}",
+        "hostedUrl": f"https://jobs.lever.co/example/{i:08x}",
+        "categories": {"location": rng.choice(LOCATIONS), "team": rng.choice(DEPARTMENTS), "commitment": "Full-time"},
+    } for i in range(postings)]).encode()
+
+
+def stripe_page(postings: int) -> bytes:
+    rng = _rng(postings)
+    rows = "".join(
+        f"<tr class='TableRow'><td><a class='JobsListings__link' href='/jobs/listing/role-{i}/{1000 + i}'>"
+        f"{rng.choice(TITLES)}, Infrastructure {i}</a></td>"
+        f"<td class='JobsListings__tableCell--departments'><ul><li>{rng.choice(DEPARTMENTS)}</li></ul></td>"
+        f"<td><span class='JobsListings__locationDisplayName'>{rng.choice(LOCATIONS)}</span></td></tr>"
+        for i in range(postings)
+    )
+    return (f"<html><head><title>Jobs</title></head><body>{FILLER * 20}<table>"
+            f"<tbody class='JobsListings__tableBody'>{rows}</tbody></table>{FILLER * 20}</body></html>").encode()
+
+
+def plaid_page(postings: int) -> bytes:
+    rng = _rng(postings)
+    cards = "".join(
+        f"<div class='MuiStack-root css-1'><div class='MuiStack-root css-2'>"
+        f"<p class='css-kluxnl'>{rng.choice(TITLES)} {i}</p>"
+        f"<p class='css-kj1jcl'>{rng.choice(LOCATIONS)}</p></div>"
+        f"<a href='/careers/openings/{rng.choice(['engineering', 'sales'])}/role-{i}'>Apply</a></div>"
+        for i in range(postings)
+    )
+    return f"<html><body>{FILLER * 20}<main>{cards}</main>{FILLER * 20}</body></html>".encode()
+
+
+# Generators for the sites in sources.toml; other sources fall back on their adapter below
+SITE_BOARDS: Dict[str, Callable[[int], bytes]] = {
+    "stripe": stripe_page,
+    "plaid": plaid_page,
+    "digitalocean": greenhouse_departments,
+    "atlassian": atlassian_listings,
+    "datadog": greenhouse_jobs,
+    "databricks": databricks_page_data,
+}
+
+
+def board_for(site: str, source) -> Optional[Callable[[int], bytes]]:
+    """Synthetic board generator for a source, or None if its payload shape is unknown."""
+    if site in SITE_BOARDS:
+        return SITE_BOARDS[site]
+    if isinstance(source, GreenhouseSource):
+        return greenhouse_departments if source.config.get("nested") else greenhouse_jobs
+    if isinstance(source, LeverSource):
+        return lever_postings
+    return None
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answer every request from a URL -> (status, headers, body) table; unknown URLs get a 404."""
+
+    def __init__(self, responses: Dict[str, Tuple[int, Dict[str, str], bytes]]):
+        super().__init__()
+        self.responses = responses
+        self._builder = HTTPAdapter()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        status, headers, body = self.responses.get(request.url, (404, {}, b""))
+        raw = HTTPResponse(body=BytesIO(body), status=status, preload_content=False,
+                           headers={"Content-Length": str(len(body)), **headers})
+        response = self._builder.build_response(request, raw)
+        if not stream:
+            response.content  # noqa: B018 - read the body like a non-streamed request would
+        return response
+
+    def close(self):
+        self._builder.close()
+
+
+def record(sources: Dict, directory: Path) -> None:
+    """Fetch every source's live response into directory as <site>.body / <site>.json."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for site, source in sources.items():
+        url = getattr(source, "url", None)
+        if not url:
+            print(f"skip {site}: not a registry source")
+            continue
+        r = requests.get(url, headers=source.headers, timeout=30)
+        (directory / f"{site}.body").write_bytes(r.content)
+        (directory / f"{site}.json").write_text(json.dumps({
+            "url": url, "status": r.status_code, "content_type": r.headers.get("Content-Type"),
+        }, indent=2))
+        print(f"recorded {site}: {r.status_code}, {len(r.content) / 1024:.0f} KiB")
+
+
+def recorded(directory: Path, site: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+    meta_path, body_path = directory / f"{site}.json", directory / f"{site}.body"
+    if not meta_path.exists() or not body_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text())
+    headers = {"Content-Type": meta["content_type"]} if meta.get("content_type") else {}
+    return meta["status"], headers, body_path.read_bytes()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Compare HTML parser backends on the Stripe and Plaid careers pages.
+
+Runs the html sources' parse and collect steps with every installed tree builder,
+with and without their listing-only SoupStrainer, and checks they all extract the
+same jobs. Saved pages (stripe.html / plaid.html in --fixtures) are used when
+present, otherwise synthetic pages with the same markup are generated.
+
+    python -m backend.benchmarks.html_parsing --save fixtures/   # capture live pages once
+    python -m backend.benchmarks.html_parsing --fixtures fixtures/
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from backend.benchmarks.fixtures import plaid_page, stripe_page
+from backend.scrapers import SCRAPERS
+from backend.scrapers.parsing import available_parsers
+
+PAGES = ("stripe", "plaid")
+
+def load_pages(fixtures: Path | None, postings: int) -> Dict[str, bytes]:
+    pages = {"stripe": stripe_page(postings), "plaid": plaid_page(postings)}
+    if fixtures:
+        for name in PAGES:
+            path = fixtures / f"{name}.html"
+            if path.exists():
+                pages[name] = path.read_bytes()
+    return pages
+
+
+def save_pages(directory: Path):
+    from backend.utils import safe_get
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in PAGES:
+        r = safe_get(SCRAPERS[name].url, use_cache=False)
+        if r:
+            (directory / f"{name}.html").write_bytes(r.content)
+            print(f"saved {name}.html ({len(r.content) / 1024:.0f} KiB)")
+
+
+def bench(fn: Callable, rounds: int) -> float:
+    """Median wall time of fn in milliseconds."""
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, help="Directory with saved stripe.html / plaid.html")
+    parser.add_argument("--save", type=Path, metavar="DIR", help="Fetch the live pages into DIR and exit")
+    parser.add_argument("--postings", type=int, default=500, help="Postings per synthetic page (default 500)")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed runs per combination (default 5)")
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save)
+        return
+
+    pages = load_pages(args.fixtures, args.postings)
+    print(f"{'page':<8} {'parser':<12} {'mode':<9} {'jobs':>6} {'median ms':>10}")
+    for name in PAGES:
+        source, markup = SCRAPERS[name], pages[name]
+        baseline = None
+        for backend in available_parsers():
+            # "strained" uses the source's configured SoupStrainer
+            for mode, overrides in (("full", {"only": None}), ("strained", {})):
+                kwargs = {"parser": backend, **overrides}
+                parse = lambda: source.collect(source.parse(markup, **kwargs))
+                jobs = parse()
+                if baseline is None:
+                    baseline = jobs
+                elif jobs != baseline:
+                    raise SystemExit(f"{name}: {backend} ({mode}) extracted different jobs than the first backend")
+                ms = bench(parse, args.rounds)
+                print(f"{name:<8} {backend:<12} {mode:<9} {len(jobs):>6} {ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
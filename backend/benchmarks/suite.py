@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the scrape pipeline and the API.
+
+Every registry source is run against a synthetic board with --sizes postings (or
+a response recorded with --record), served by a transport adapter instead of the
+network. It also times the diff, state commit/load for both state backends,
+building and encoding the views, the top-jobs index, the /jobs search index and,
+when fakeredis is installed, GET /jobs and /top_jobs through the app. Each result
+reports median latency, throughput and peak Python heap (tracemalloc; memory held
+by C extensions such as lxml isn't counted).
+
+    python -m backend.benchmarks.suite --sizes 10000,100000 --output bench.json
+    python -m backend.benchmarks.suite --compare bench.json     # after a change
+    python -m backend.benchmarks.suite --record fixtures/        # capture live responses once
+    python -m backend.benchmarks.suite --fixtures fixtures/      # replay them
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Benchmarks measure our code, not the politeness delay between requests, and the
+# app must not start scraping on its own when the API benchmarks open it
+os.environ.setdefault("HTTP_RATE_PER_HOST", "0")
+os.environ.setdefault("SCRAPE_SCHEDULER_ENABLED", "false")
+
+from backend.logger import logger
+from backend import state, utils
+from backend.alert import SiteDiff, diff_jobs_for_site
+from backend.core import _scrape_site
+from backend.benchmarks import fixtures
+from backend.http_client import RequestsClient, client
+from backend.scrapers import SCRAPERS
+from backend.scrapers.parsing import resolve_parser
+from backend.search import build_index
+from backend.top_jobs import TopJobsIndex
+from backend.views import build_views, encode_view, publish_views
+
+try:
+    import fakeredis
+    from fastapi.testclient import TestClient
+except ImportError:  # optional: the API benchmarks need an in-memory Redis and httpx
+    fakeredis = None
+
+Result = Dict[str, object]
+
+
+def measure(name: str, size: int, fn: Callable[[], object], rounds: int, items: Optional[int] = None) -> Result:
+    """Time fn over `rounds` runs, then run it once more under tracemalloc for peak memory."""
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(times)
+    items = size if items is None else items
+    return {
+        "name": name,
+        "size": size,
+        "rounds": rounds,
+        "median_s": round(median, 6),
+        "min_s": round(min(times), 6),
+        "max_s": round(max(times), 6),
+        "throughput_per_s": round(items / median, 1) if median and items else None,
+        "peak_mem_bytes": peak,
+    }
+
+
+def synthetic_jobs(count: int, site: str = "example", salt: str = "") -> List[Dict]:
+    return [{
+        "title": f"{fixtures.TITLES[i % len(fixtures.TITLES)]} {i % 97}{salt}",
+        "link": f"https://example.com/{site}/jobs/{i}",
+        "location": fixtures.LOCATIONS[i % len(fixtures.LOCATIONS)],
+        "category": fixtures.DEPARTMENTS[i % len(fixtures.DEPARTMENTS)],
+        "site": site,
+    } for i in range(count)]
+
+
+def steady_state(size: int, site: str = "example"):
+    """Previous and current job lists for a typical check: ~5% new, ~5% gone, ~5% changed."""
+    previous = synthetic_jobs(size, site)
+    current = [dict(job) for job in previous[size // 20:]]
+    for job in current[::20]:
+        job["location"] += " (Hybrid)"
+    current += synthetic_jobs(size + size // 20, site)[size:]
+    return previous, current
+
+
+def bench_scrapers(size: int, rounds: int, fixture_dir: Optional[Path], results: List[Result]):
+    transport = client.client
+    if not isinstance(transport, RequestsClient):
+        raise SystemExit("Scraper benchmarks replay through requests; unset HTTP2 and run again")
+
+    responses, sizes = {}, {}
+    for site, source in SCRAPERS.items():
+        url = getattr(source, "url", None)
+        replay = fixture_dir and fixtures.recorded(fixture_dir, site)
+        if url and replay:
+            responses[url], sizes[site] = replay, 0  # a recording has its own size
+        elif url and fixtures.board_for(site, source):
+            responses[url], sizes[site] = (200, {}, fixtures.board_for(site, source)(size)), size
+        else:
+            logger.warning(f"[Bench] No fixture for {site}; skipped")
+
+    adapter = fixtures.ReplayAdapter(responses)
+    transport.session.mount("http://", adapter)
+    transport.session.mount("https://", adapter)
+    try:
+        for site, postings in sizes.items():
+            source = SCRAPERS[site]
+            # The same path as a check: fingerprinting, metrics, fetch, parse, filter
+            scrape = lambda: _scrape_site(site, source, None)
+            result = measure(f"scrape.{site}", postings, scrape, rounds)
+            result["jobs"] = len(scrape().jobs)
+            result["response_bytes"] = len(responses[source.url][2])
+            results.append(result)
+    finally:
+        transport.session.mount("https://", transport.adapter)
+        transport.session.mount("http://", transport.adapter)
+
+
+def bench_diff(size: int, rounds: int, results: List[Result]):
+    previous, current = steady_state(size)
+    results.append(measure("diff", size, lambda: diff_jobs_for_site("example", current, previous), rounds))
+
+
+def bench_state(size: int, rounds: int, workdir: Path, results: List[Result]):
+    utils.DATA_FILE = state.DATA_FILE = workdir / "jobs-seen.json"
+    sites = list(SCRAPERS) or ["example"]
+    per_site = max(1, size // len(sites))
+
+    previous, diffs = {}, []
+    for site in sites:
+        before, after = steady_state(per_site, site)
+        previous[site] = before
+        diffs.append(diff_jobs_for_site(site, after, before))
+    fingerprints = {site: "0" * 64 for site in sites}
+    initial = [SiteDiff(site=site, added=jobs, current=jobs) for site, jobs in previous.items()]
+
+    for backend, store in (("json", state.JsonStateStore()), ("sqlite", state.SqliteStateStore(workdir / "jobs-seen.db"))):
+        store.commit(initial, fingerprints)
+        results.append(measure(f"state.{backend}.commit", size, lambda: store.commit(diffs, fingerprints), rounds))
+        results.append(measure(f"state.{backend}.load", size, store.load, rounds))
+
+
+def bench_views(size: int, rounds: int, results: List[Result]):
+    sites = list(SCRAPERS) or ["example"]
+    seen = {site: synthetic_jobs(size // len(sites), site) for site in sites}
+    views = build_views(seen)
+    results.append(measure("views.build", size, lambda: build_views(seen), rounds))
+    results.append(measure("views.encode", size, lambda: [encode_view(v) for v in views.values()], rounds))
+
+    # A check's top-jobs cost: rescoring one steady-state diff vs rescanning everything
+    top_jobs = TopJobsIndex()
+    top_jobs.rebuild(seen)
+    previous, current = steady_state(len(seen[sites[0]]), sites[0])
+    diff = diff_jobs_for_site(sites[0], current, previous)
+    results.append(measure("top_jobs.rebuild", size, lambda: top_jobs.rebuild(seen), rounds))
+    results.append(measure("top_jobs.apply", size, lambda: (top_jobs.apply(diff), top_jobs.view()), rounds))
+
+    body = encode_view(views["jobs"])["identity"]
+    index = build_index(body, 1)
+    results.append(measure("search.index_build", size, lambda: build_index(body, 1), rounds))
+    results.append(measure("search.query", size, lambda: index.search(keyword="engineer", location="new york", sort="title"), rounds))
+
+    if fakeredis is None:
+        logger.warning("[Bench] fakeredis or httpx not installed; skipping the API request benchmarks")
+        return
+    from backend import api
+
+    server = fakeredis.FakeServer()
+    api.r = fakeredis.FakeRedis(server=server, decode_responses=True)
+    api.r_views = fakeredis.FakeRedis(server=server)
+    api.r_views_async = fakeredis.aioredis.FakeRedis(server=server)
+    api.change_feed.r = fakeredis.aioredis.FakeRedis(server=server)
+    publish_views(api.r_views, views)
+    gzip = {"Accept-Encoding": "gzip"}
+    with TestClient(api.app) as http:  # one event loop for every request, as under uvicorn
+        for name, path in (("api.jobs", "/jobs"), ("api.top_jobs", "/top_jobs"), ("api.jobs_search", "/jobs?keyword=engineer&limit=50")):
+            http.get(path, headers=gzip)  # warm: builds the search index once per version
+            results.append(measure(name, size, lambda: http.get(path, headers=gzip).raise_for_status(), rounds))
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current: List[Result], baseline_path: Path, threshold: float = 0.10):
+    baseline = {(r["name"], r["size"]): r for r in json.loads(baseline_path.read_text())["results"]}
+    print(f"\n{'benchmark':<28} {'size':>7} {'before s':>10} {'after s':>10} {'change':>8}", file=sys.stderr)
+    for result in current:
+        before = baseline.get((result["name"], result["size"]))
+        if not before:
+            continue
+        change = result["median_s"] / before["median_s"] - 1 if before["median_s"] else 0
+        flag = "  slower" if change > threshold else "  faster" if change < -threshold else ""
+        print(f"{result['name']:<28} {result['size']:>7} {before['median_s']:>10.4f} {result['median_s']:>10.4f} {change:>+8.0%}{flag}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--sizes", default="10000", help="Comma-separated board sizes in postings (default 10000)")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed runs per benchmark (default 3)")
+    parser.add_argument("--only", help="Comma-separated groups to run: scrape, diff, state, views")
+    parser.add_argument("--fixtures", type=Path, help="Replay responses recorded with --record instead of synthetic boards")
+    parser.add_argument("--record", type=Path, metavar="DIR", help="Record every source's live response into DIR and exit")
+    parser.add_argument("--output", type=Path, help="Write results as JSON here (default: stdout)")
+    parser.add_argument("--compare", type=Path, metavar="JSON", help="Show the change against an earlier --output file")
+    args = parser.parse_args()
+
+    if args.record:
+        fixtures.record(SCRAPERS, args.record)
+        return
+
+    # Keep per-job log lines (stale jobs etc.) out of the measurements
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    groups = set(args.only.split(",")) if args.only else {"scrape", "diff", "state", "views"}
+    results: List[Result] = []
+    with tempfile.TemporaryDirectory(prefix="job-scraper-bench-") as tmp:
+        workdir = Path(tmp)
+        utils.http_cache.directory = workdir / "http-cache"
+        for size in (int(s) for s in args.sizes.split(",")):
+            print(f"[size {size}]", file=sys.stderr)
+            if "scrape" in groups:
+                bench_scrapers(size, args.rounds, args.fixtures, results)
+            if "diff" in groups:
+                bench_diff(size, args.rounds, results)
+            if "state" in groups:
+                bench_state(size, args.rounds, workdir, results)
+            if "views" in groups:
+                bench_views(size, args.rounds, results)
+
+    for r in results:
+        print(f"  {r['name']:<28} {r['size']:>7} {r['median_s'] * 1000:>10.1f} ms {r['peak_mem_bytes'] / 2**20:>8.1f} MiB", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "html_parser": resolve_parser(),
+            "ijson": utils.ijson is not None,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Single-flight coordination for the API.
+
+Only one caller does a piece of expensive work at a time: threads in this process
+queue on a local lock, and other processes/replicas queue on a leased Redis lock.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+import redis
+from redis.exceptions import LockError
+
+from backend.logger import logger
+
+CACHE_LOCK_LEASE_SECONDS = 60  # how long a holder may keep the lock before it expires
+CACHE_WAIT_SECONDS = 10        # how long to wait on another worker's holder
+
+_local_locks: Dict[str, threading.Lock] = {}
+_local_locks_guard = threading.Lock()
+
+
+def _local_lock(name: str) -> threading.Lock:
+    with _local_locks_guard:
+        return _local_locks.setdefault(name, threading.Lock())
+
+
+@contextmanager
+def single_flight(r: redis.Redis, name: str, lease: float = CACHE_LOCK_LEASE_SECONDS, wait: float = CACHE_WAIT_SECONDS):
+    """
+    Hold `name` exclusively across threads and workers. Yields True once the lock is
+    held, or False if another worker kept it for longer than `wait`. Callers should
+    re-check whatever they were about to build after entering, since the previous
+    holder has usually just built it.
+    """
+    with _local_lock(name):
+        lock = r.lock(f"lock:{name}", timeout=lease, blocking_timeout=wait)
+        acquired = lock.acquire()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except LockError:
+                    logger.warning(f"[Cache] Lease on {name} expired before the work finished")
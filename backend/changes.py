@@ -0,0 +1,112 @@
+"""
+Change feed: each check's diff, pushed to dashboard clients over SSE.
+
+After a check publishes its views, the API worker that ran it publishes one event
+with every site's added, updated and removed jobs plus the new stats. It goes out on
+a Redis pub/sub channel, so every worker and replica forwards it to its own SSE
+clients, and onto a short Redis list, so a reconnecting client can catch up on what
+it missed. Event ids are the views version the event leads to; a client further
+behind than the list reaches is told to reset, i.e. refetch everything.
+
+Within a process, ChangeFeed holds the one Redis subscription and fans events out to
+a bounded queue per client, so SSE clients don't each hold a Redis connection.
+"""
+import asyncio
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+import redis
+import redis.asyncio
+
+from backend.alert import SiteDiff
+from backend.logger import logger
+
+CHANGES_CHANNEL = "changes:events"
+CHANGES_LOG_KEY = "changes:log"
+CHANGES_LOG_LENGTH = 50        # events kept for reconnecting clients
+CLIENT_QUEUE_SIZE = 32         # events a slow client may fall behind before it is reset
+RESUBSCRIBE_DELAY_SECONDS = 1.0
+
+RESET = {"reset": True}  # queued for a client that may have missed events
+
+
+def change_event(version: int, diffs: Iterable[SiteDiff], stats: Dict) -> Dict:
+    """The event for one check. Removed jobs are sent as their links only."""
+    sites = {}
+    for diff in diffs:
+        if diff.added or diff.updated or diff.removed:
+            sites[diff.site] = {
+                "added": diff.added,
+                "updated": diff.updated,
+                "removed": [job.get("link") for job in diff.removed],
+            }
+    return {
+        "version": version,
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "stats": stats,
+        "sites": sites,
+    }
+
+
+def publish_changes(r: redis.Redis, event: Dict) -> None:
+    payload = json.dumps(event)
+    pipe = r.pipeline(transaction=True)
+    pipe.rpush(CHANGES_LOG_KEY, payload)
+    pipe.ltrim(CHANGES_LOG_KEY, -CHANGES_LOG_LENGTH, -1)
+    pipe.publish(CHANGES_CHANNEL, payload)
+    pipe.execute()
+    logger.debug(f"[Changes] Published changes for views version {event['version']} ({len(event['sites'])} sites changed)")
+
+
+async def events_since(r: redis.asyncio.Redis, version: int) -> Optional[List[Dict]]:
+    """Logged events after `version`, or None if some of them were already trimmed."""
+    events = [json.loads(payload) for payload in await r.lrange(CHANGES_LOG_KEY, 0, -1)]
+    missed = [event for event in events if event["version"] > version]
+    if missed and missed[0]["version"] != version + 1:
+        return None
+    if not missed and events and events[-1]["version"] < version:
+        return None  # the client is ahead of us: Redis was flushed and versions restarted
+    return missed
+
+
+class ChangeFeed:
+    """One pub/sub subscription per process, fanned out to every SSE client's queue."""
+
+    def __init__(self, r: redis.asyncio.Redis):
+        self.r = r
+        self._queues: Set[asyncio.Queue] = set()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._queues.discard(queue)
+
+    def _deliver(self, event: Dict) -> None:
+        for queue in self._queues:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too far behind to apply deltas in order: drop its backlog and reset it
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESET)
+
+    async def run(self) -> None:
+        """Forward published events until cancelled, resubscribing after Redis errors."""
+        while True:
+            pubsub = self.r.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANGES_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._deliver(json.loads(message["data"]))
+            except redis.RedisError as e:
+                logger.warning(f"[Changes] Lost the change feed subscription ({e}); resubscribing")
+                self._deliver(RESET)  # anything published meanwhile was missed
+                await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+            finally:
+                await pubsub.aclose()
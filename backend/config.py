@@ -15,23 +15,91 @@ Alerts three times daily when new jobs appear.
 """
 
 DATA_FILE = Path("/app/data/jobs-seen.json")
+STATE_DB_FILE = Path("/app/data/jobs-seen.db")
+STATE_BACKEND = os.getenv("STATE_BACKEND", "json")  # "json" or "sqlite"
 LOG_FILE = Path("/app/data/logs/job-scraper.log")
+HTTP_CACHE_DIR = Path("/app/data/http-cache")
 
-PLAID_URL = "https://plaid.com/careers/?department=Engineering#search"
-DIGITALOCEAN_URL = "https://api.greenhouse.io/v1/boards/digitalocean98/embed/departments"
-STRIPE_URL = "https://stripe.com/jobs/search?teams=Infrastructure+%26+Corporate+Tech&teams=University&office_locations=North+America--Atlanta&office_locations=North+America--Chicago&office_locations=North+America--New+York&office_locations=North+America--New+York+Privy+HQ&office_locations=North+America--San+Francisco+Bridge+HQ&office_locations=North+America--Seattle&office_locations=North+America--South+San+Francisco&office_locations=North+America--Washington+DC"
-ATLASSIAN_URL = "https://www.atlassian.com/endpoint/careers/listings"
-DATADOG_URL = "https://api.greenhouse.io/v1/boards/datadog/jobs"
-DATBRICKS_URL = "https://www.databricks.com/careers-assets/page-data/company/careers/open-positions/page-data.json"
+# Career sites to scrape; see the comments in that file for the format
+SOURCES_FILE = Path(os.getenv("SOURCES_FILE", Path(__file__).parent / "scrapers" / "sources.toml"))
 
 FILTER_KEYWORDS = ["PhD", "Senior", "Staff", "Product", "Program", "Manager", 
                    "Principal", "Director", "Principle", "Head", "Distinguished",
-                   "Marketing", "Accounting", "Salesforce", "Account", "CTO",
+                   "Marketing", "Accounting", "Salesforce", "Account", "Accountant", "CTO",
                    "Sr", "Commercial", "Executive Assistant", "Capital Markets"]
 
 GMAIL_SENDER = os.getenv("GMAIL_SENDER")
 GMAIL_PASSWD = os.getenv("GMAIL_PASSWD")
 ALERT_RECIPIENT = os.getenv("ALERT_RECIPIENT")
 
+# Alert delivery: alerts are queued in ALERT_OUTBOX_FILE and sent by a background
+# dispatcher over a kept-open SMTP connection and/or to webhooks, with retries
+ALERT_OUTBOX_FILE = Path("/app/data/alert-outbox.db")
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", 60))  # close the connection after this long unused
+ALERT_WEBHOOK_URLS = [u.strip() for u in os.getenv("ALERT_WEBHOOK_URLS", "").split(",") if u.strip()]
+ALERT_BATCH_SIZE = int(os.getenv("ALERT_BATCH_SIZE", 20))
+ALERT_MAX_ATTEMPTS = int(os.getenv("ALERT_MAX_ATTEMPTS", 8))
+ALERT_RETRY_BASE = float(os.getenv("ALERT_RETRY_BASE", 30))
+ALERT_RETRY_MAX = float(os.getenv("ALERT_RETRY_MAX", 60 * 60))
+
 USER_AGENT = "Mozilla/5.0 (compatible; JobAlertBot/1.0; +https://example.com/)"
 
+# HTTP client for scrape requests: timeouts, connection pools (host pools x connections
+# per host), HTTP/2 through httpx[http2] when installed, and DNS answer caching
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 15))
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", 10))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 6))
+HTTP2 = os.getenv("HTTP2", "false").lower() in ("1", "true", "yes")
+DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", 300))  # seconds scrape connections reuse an answer; 0 disables
+
+# Resilience: retries with jittered exponential backoff (capped, Retry-After honored up
+# to the cap), a per-host request rate limit, and a per-host circuit breaker
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 3))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", 0.5))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", 20))
+HTTP_RATE_PER_HOST = float(os.getenv("HTTP_RATE_PER_HOST", 2))  # requests/second; 0 disables
+HTTP_RATE_BURST = float(os.getenv("HTTP_RATE_BURST", 4))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 3))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", 10 * 60))
+
+# Open an OpenTelemetry span per scrape stage (needs opentelemetry-api and an SDK/exporter)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# HTML tree builder for the page scrapers: "auto" picks lxml when installed, else html.parser
+HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+
+# Top jobs: comma-separated "keyword:weight" pairs (weight defaults to 1). Jobs are
+# ranked by the summed weight of the keywords in their title; a keyword found only in
+# the description counts at TOP_JOBS_DESCRIPTION_WEIGHT of its weight
+TOP_JOBS_KEYWORDS = {
+    keyword.strip(): float(weight or 1)
+    for keyword, _, weight in (item.partition(":") for item in os.getenv(
+        "TOP_JOBS_KEYWORDS", "devops:3,site reliability:3,sre:3,platform:2,infrastructure:2").split(","))
+    if keyword.strip()
+}
+TOP_JOBS_DESCRIPTION_WEIGHT = float(os.getenv("TOP_JOBS_DESCRIPTION_WEIGHT", 0.5))
+
+# Scrape engine: how many sites are fetched at once and how long a single site may take
+SCRAPE_MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", 6))
+SCRAPE_SITE_TIMEOUT = float(os.getenv("SCRAPE_SITE_TIMEOUT", 60))
+
+# Background scheduler in the API: a check every interval plus up to jitter seconds
+SCRAPE_SCHEDULER_ENABLED = os.getenv("SCRAPE_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+SCRAPE_INTERVAL_SECONDS = float(os.getenv("SCRAPE_INTERVAL_SECONDS", 30 * 60))
+SCRAPE_JITTER_SECONDS = float(os.getenv("SCRAPE_JITTER_SECONDS", 60))
+
+# Shared Redis: views, locks, the change feed and the distributed scrape queue
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+
+# Where checks scrape: "local" in the API process, or "distributed" on workers started
+# with `python -m backend.main --worker`, which claim per-site tasks from Redis under a lease
+SCRAPE_MODE = os.getenv("SCRAPE_MODE", "local")
+SCRAPE_TASK_LEASE_SECONDS = float(os.getenv("SCRAPE_TASK_LEASE_SECONDS", 30))  # renewed by the worker's heartbeat
+SCRAPE_TASK_MAX_ATTEMPTS = int(os.getenv("SCRAPE_TASK_MAX_ATTEMPTS", 3))
+SCRAPE_RUN_TIMEOUT = float(os.getenv("SCRAPE_RUN_TIMEOUT", 10 * 60))  # must stay below the scrape lock lease
+
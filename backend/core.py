@@ -1,22 +1,190 @@
 # backend/jobs.py
-from backend.utils import load_seen, save_seen
+import hashlib
+import inspect
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from backend.utils import http_cache, fingerprint_guard, SiteUnchanged
 from backend.scrapers import SCRAPERS
 from backend.logger import logger
-from backend.alert import alert, find_new_jobs_for_site
+from backend.alert import SiteDiff, alert, diff_jobs_for_site
+from backend.state import state_store
+from backend.top_jobs import TopJobsIndex
+from backend.views import build_views
+from backend.config import SCRAPE_MAX_WORKERS, SCRAPE_SITE_TIMEOUT, FILTER_KEYWORDS, STATE_BACKEND
+from backend import filters, metrics
+
+
+# Ranked top jobs, updated from each check's diffs rather than rescanned
+top_jobs_index = TopJobsIndex()
+
+
+class ScrapeResult(NamedTuple):
+    jobs: Optional[List[Dict]] = None        # None when the site was unchanged or failed
+    fingerprint: Optional[str] = None        # hash of the site's raw payload
+    unchanged: bool = False                  # payload matched the previous fingerprint
+    error: Optional[Exception] = None
+
+
+class CheckResult(NamedTuple):
+    views: Dict[str, object]                 # derived views of the state after the check
+    diffs: List[SiteDiff]                    # changes of every site that was re-parsed
+
+
+def _parser_salt(fn: Callable) -> bytes:
+    """
+    Identify the code and rules that turn a site's payload into jobs, so editing a
+    scraper, its registry entry or the title filters invalidates its fingerprint
+    and forces a re-parse.
+    """
+    digest = hashlib.sha256(repr(FILTER_KEYWORDS).encode("utf-8"))
+    # Registry sources are adapter instances: hash their options and format hooks too
+    digest.update(repr(getattr(fn, "config", None)).encode("utf-8"))
+    hooks = [inspect.getmodule(hook) for hook in getattr(fn, "formatters", {}).values()]
+    for obj in (inspect.getmodule(fn), filters, *hooks):
+        try:
+            digest.update(inspect.getsource(obj).encode("utf-8"))
+        except (OSError, TypeError):
+            digest.update(repr(obj).encode("utf-8"))
+    return digest.digest()
+
+
+def _scrape_site(site: str, fn: Callable[[], List[Dict]], previous: Optional[str]) -> ScrapeResult:
+    with metrics.site_scope(site), metrics.stage(site, "total"):
+        with fingerprint_guard(previous, _parser_salt(fn)) as guard:
+            try:
+                jobs = fn()
+            except SiteUnchanged as unchanged:
+                return ScrapeResult(fingerprint=unchanged.fingerprint, unchanged=True)
+        return ScrapeResult(jobs=jobs, fingerprint=guard["fingerprint"])
+
 
-def run_check_once():
+def scrape_all(
+    scrapers: Dict[str, Callable[[], List[Dict]]],
+    fingerprints: Optional[Dict[str, str]] = None,
+) -> Dict[str, ScrapeResult]:
+    """
+    Run every scraper concurrently on a bounded thread pool.
+    Returns {site: ScrapeResult} in the same order as `scrapers`. Sites whose
+    payload hashes to the fingerprint in `fingerprints` come back as unchanged
+    without being parsed.
+    """
+    if not scrapers:
+        return {}
+    fingerprints = fingerprints or {}
+
+    workers = max(1, min(SCRAPE_MAX_WORKERS, len(scrapers)))
+    # Each site gets SCRAPE_SITE_TIMEOUT from the moment a worker picks it up. Sites
+    # queued behind hung ones may never get a worker, so those are given up on once
+    # every "wave" the pool needs has had its full timeout.
+    waves = math.ceil(len(scrapers) / workers)
+    give_up = time.monotonic() + SCRAPE_SITE_TIMEOUT * waves
+    started: Dict[str, float] = {}
+
+    def run(site: str, fn: Callable[[], List[Dict]], previous: Optional[str]) -> ScrapeResult:
+        started[site] = time.monotonic()
+        return _scrape_site(site, fn, previous)
+
+    results: Dict[str, ScrapeResult] = {}
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrape")
+    try:
+        futures = {pool.submit(run, site, fn, fingerprints.get(site)): site for site, fn in scrapers.items()}
+        pending = set(futures)
+        while pending:
+            # Wake for the earliest running site's deadline; a site that hasn't started
+            # yet can't expire before a full timeout from now, or the run gives up on it
+            now = time.monotonic()
+            wake = min(
+                started[futures[f]] + SCRAPE_SITE_TIMEOUT if futures[f] in started
+                else min(now + SCRAPE_SITE_TIMEOUT, give_up)
+                for f in pending
+            )
+            done, pending = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = ScrapeResult(error=e)
+            now = time.monotonic()
+            for future in list(pending):
+                site = futures[future]
+                if site in started and now - started[site] >= SCRAPE_SITE_TIMEOUT:
+                    error = TimeoutError(f"no result within {SCRAPE_SITE_TIMEOUT:.0f}s")
+                elif site not in started and now >= give_up:
+                    error = TimeoutError("never started; every worker was busy with a hung site")
+                else:
+                    continue
+                future.cancel()
+                pending.discard(future)
+                results[site] = ScrapeResult(error=error)
+    finally:
+        # Don't let a hung site hold up the run; its thread finishes in the background.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return {site: results[site] for site in scrapers}
+
+
+Scrape = Callable[[Dict[str, Callable[[], List[Dict]]], Dict[str, str]], Dict[str, ScrapeResult]]
+
+
+def run_check_once(scrape: Scrape = scrape_all) -> CheckResult:
+    """
+    Run one full check; returns the derived views of the resulting state and the diffs.
+    `scrape` fetches the sites: scrape_all here, or the distributed scrape queue.
+    """
     logger.debug("Starting job check")
-    seen = load_seen()
+    # Read before loading: a commit in between only makes the top-jobs index rebuild again
+    state_version = state_store.version()
+    seen = state_store.load()
+    # A fingerprint only lets a site carry its jobs forward if there are jobs to carry:
+    # never for a site missing from the loaded state, nor when the state came back empty
+    # (deleted, corrupt or restored), so a lost state is always re-scraped.
+    fingerprints = {}
+    if any(seen.values()):
+        fingerprints = {site: fp for site, fp in state_store.load_fingerprints().items() if site in seen}
+    top_jobs_index.sync(seen, state_version)
     all_new = {}
+    diffs = []
+    checked = {}  # site -> fingerprint for every site checked successfully
     any_error = False
 
-    for site, fn in SCRAPERS.items():
+    start = time.monotonic()
+    results = scrape(SCRAPERS, fingerprints)
+    cache_stats = http_cache.stats()
+    logger.debug(
+        f"[Scrape] fetched {len(results)} sites in {time.monotonic() - start:.2f}s "
+        f"(HTTP cache hits {cache_stats['hits']}, misses {cache_stats['misses']})"
+    )
+
+    # Merge in SCRAPERS order so the diff and alert output match a serial run
+    for site, result in results.items():
+        if result.unchanged:
+            # Same payload as last time: previous jobs carry forward untouched
+            metrics.site_results.labels(site, "unchanged").inc()
+            all_new[site] = []
+            checked[site] = result.fingerprint
+            logger.info(f"[{site}] unchanged since last check, {len(seen.get(site, []))} jobs carried forward")
+            continue
         try:
-            jobs = fn()
-            newjobs = find_new_jobs_for_site(site, jobs, seen)
-            all_new[site] = newjobs
-            logger.info(f"[{site}] total found {len(jobs)}, new {len(newjobs)}")
+            if result.error is not None:
+                raise result.error
+            jobs = result.jobs
+            with metrics.stage(site, "diff"):
+                diff = diff_jobs_for_site(site, jobs, seen.get(site, []))
+                top_jobs_index.apply(diff)
+            seen[site] = diff.current
+            diffs.append(diff)
+            all_new[site] = diff.added
+            checked[site] = result.fingerprint
+            logger.info(f"[{site}] total found {len(jobs)}, new {len(diff.added)}")
+            metrics.site_results.labels(site, "parsed").inc()
+            metrics.jobs_found.labels(site).set(len(jobs))
+            for change, changed in (("new", diff.added), ("updated", diff.updated), ("stale", diff.removed)):
+                metrics.job_changes.labels(site, change).inc(len(changed))
         except Exception as e:
+            metrics.site_results.labels(site, "failed").inc()
             logger.exception(f"[Scrape] Error scraping {site}: {e}")
             all_new[site] = []
             any_error = True
@@ -24,12 +192,17 @@ def run_check_once():
     try:
         alert(all_new)
     except Exception as e:
-        logger.exception(f"[Email] Error sending alert: {e}")
+        logger.exception(f"[Alerts] Error queueing alert: {e}")
 
     try:
-        save_seen(seen)
+        with metrics.span("state.commit", backend=STATE_BACKEND), \
+                metrics.state_write_seconds.labels(STATE_BACKEND).time():
+            state_store.commit(diffs, checked)
+        top_jobs_index.committed(state_store.version())
     except Exception as e:
         logger.exception(f"[State] Failed to save seen state: {e}")
 
     if any_error:
         logger.warning("[Scrape] Some scrapes failed this run; check logs.")
+
+    return CheckResult(build_views(seen, top_jobs_index), diffs)
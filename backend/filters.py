@@ -0,0 +1,43 @@
+"""
+Compiled keyword matching shared by the scrapers and the top-jobs view.
+
+A KeywordMatcher folds a rule set into a single case-insensitive alternation regex,
+so checking a title is one regex pass instead of lowercasing the title and every
+keyword again. Whole-word matching is the default: "Sr" matches "Sr. Engineer" but
+not "SRE" or "Israel".
+"""
+import re
+from typing import Iterable, List
+
+from backend.config import FILTER_KEYWORDS
+
+
+class KeywordMatcher:
+    def __init__(self, terms: Iterable[str], whole_word: bool = True):
+        self.terms = [t for t in terms if t]
+        self._canonical = {t.lower(): t for t in self.terms}
+        if not self.terms:
+            self._regex = re.compile(r"(?!)")  # matches nothing
+            return
+        # Longest first so "new york city" wins over "new york" in findall
+        alternation = "|".join(re.escape(t) for t in sorted(self.terms, key=len, reverse=True))
+        # Lookarounds rather than \b so terms may start or end with punctuation
+        pattern = rf"(?<!\w)(?:{alternation})(?!\w)" if whole_word else f"(?:{alternation})"
+        self._regex = re.compile(pattern, re.IGNORECASE)
+
+    def search(self, text: str) -> bool:
+        """True if any term occurs in text."""
+        return bool(text) and self._regex.search(text) is not None
+
+    def findall(self, *texts: str) -> List[str]:
+        """Distinct terms found in any of texts, in the order they were configured."""
+        found = {
+            self._canonical[m.group(0).lower()]
+            for text in texts if text
+            for m in self._regex.finditer(text)
+        }
+        return [t for t in self.terms if t in found]
+
+
+# Titles containing any of these are dropped by every scraper
+EXCLUDED_TITLES = KeywordMatcher(FILTER_KEYWORDS)
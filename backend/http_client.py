@@ -0,0 +1,237 @@
+"""
+HTTP client used for every scrape request.
+
+One long-lived client per process keeps a connection pool per host, so sites on the
+same host (several boards live on api.greenhouse.io) share warm keep-alive
+connections within a check, and connections stay open between scheduled checks for
+as long as the servers allow. Connect and read timeouts are separate, DNS answers
+for scrape connections are cached for a short TTL, and HTTP/2 is used through httpx
+when HTTP2 is enabled and httpx[http2] is installed.
+
+Both backends return requests.Response objects, so callers (and the HTTP cache)
+don't care which one is in use. Requests go through backend.resilience for
+retries, per-host rate limits and circuit breakers.
+"""
+import ipaddress
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import httpx
+except ImportError:  # optional: HTTP/2 support only
+    httpx = None
+
+from backend.config import (
+    USER_AGENT, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_POOL_HOSTS,
+    HTTP_POOL_SIZE, HTTP2, DNS_CACHE_TTL,
+)
+from backend.logger import logger
+from backend.resilience import ResilientClient
+
+
+DNS_CACHE_SIZE = 256  # hosts remembered; the least recently used is dropped first
+
+
+class DnsCache:
+    """
+    Addresses of the hosts scrapers connect to, each kept for `ttl` seconds. Only the
+    scrape connections use it (see _CachedDnsConnection); Redis, SMTP, webhooks and
+    everything else in the process resolve as usual. Only successful lookups are
+    cached, and TLS still verifies against the hostname.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = DNS_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int) -> str:
+        """An address to connect to for host:port. Raises OSError if the lookup fails."""
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+        address = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][4][0]
+        with self._lock:
+            self._entries[key] = (now + self.ttl, address)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return address
+
+    def forget(self, host: str, port: int) -> None:
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+dns_cache = DnsCache(DNS_CACHE_TTL) if DNS_CACHE_TTL > 0 else None
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+class _CachedDnsConnection:
+    """
+    Connects to the address in dns_cache instead of resolving the host again. The
+    connection keeps its hostname, so the Host header, SNI and certificate checks
+    are unchanged.
+    """
+
+    def _new_conn(self):
+        hostname = self._dns_host
+        if dns_cache is None or _is_ip(hostname):
+            return super()._new_conn()
+        try:
+            address = dns_cache.resolve(hostname, self.port)
+        except OSError:
+            return super()._new_conn()  # let urllib3 resolve and report the failure
+        self._dns_host = address
+        try:
+            return super()._new_conn()
+        except Exception:
+            dns_cache.forget(hostname, self.port)  # the host may have moved; look it up again next time
+            raise
+        finally:
+            self._dns_host = hostname
+
+
+class _HTTPConnection(_CachedDnsConnection, HTTPConnection):
+    pass
+
+
+class _HTTPSConnection(_CachedDnsConnection, HTTPSConnection):
+    pass
+
+
+class _HTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _HTTPConnection
+
+
+class _HTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _HTTPSConnection
+
+
+class ScrapeAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections resolve hosts through dns_cache."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPConnectionPool, "https": _HTTPSConnectionPool}
+
+
+class RequestsClient:
+    """requests.Session with an explicitly sized connection pool per host."""
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        self.adapter = ScrapeAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, stream: bool = False, **kwargs) -> requests.Response:
+        return self.session.get(url, headers=headers, timeout=self.timeout, stream=stream, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class _HttpxRaw:
+    """Just enough of urllib3's response for requests.Response to stream from httpx."""
+
+    def __init__(self, response):
+        self._response = response
+
+    def stream(self, chunk_size: int, decode_content: bool = True) -> Iterator[bytes]:
+        yield from self._response.iter_bytes(chunk_size)
+
+    def close(self) -> None:
+        self._response.close()
+
+    def release_conn(self) -> None:
+        self._response.close()
+
+
+class HttpxClient:
+    """
+    httpx.Client with HTTP/2; responses are converted to requests.Response. It doesn't
+    use dns_cache: one multiplexed connection per host rarely needs a lookup.
+    """
+
+    def __init__(self):
+        # httpx pools are global rather than per host; size it like the requests pools.
+        # Over HTTP/2 a single connection per host carries all concurrent requests.
+        connections = HTTP_POOL_HOSTS * HTTP_POOL_SIZE
+        self.client = httpx.Client(
+            http2=True,
+            headers={"User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+            follow_redirects=True,
+        )
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, stream: bool = False, params=None) -> requests.Response:
+        request = self.client.build_request("GET", url, headers=headers, params=params)
+        # Surface failures as requests' exceptions, which the retry layer understands
+        try:
+            response = self.client.send(request, stream=stream)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+
+        converted = requests.Response()
+        converted.status_code = response.status_code
+        converted.reason = response.reason_phrase
+        converted.url = str(response.url)
+        converted.headers = CaseInsensitiveDict(response.headers)
+        converted.encoding = get_encoding_from_headers(converted.headers)
+        if stream:
+            converted.raw = _HttpxRaw(response)
+        else:
+            converted._content = response.read()
+            response.close()
+        return converted
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def make_client():
+    """The client for this process, per the HTTP_* settings."""
+    if HTTP2:
+        if httpx is not None:
+            try:
+                return HttpxClient()
+            except ImportError as e:  # httpx without the h2 extra
+                logger.warning(f"[HTTP] HTTP2 is enabled but unavailable ({e}); using HTTP/1.1")
+        else:
+            logger.warning("[HTTP] HTTP2 is enabled but httpx is not installed; using HTTP/1.1")
+    return RequestsClient()
+
+
+client = ResilientClient(make_client())
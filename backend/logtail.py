@@ -0,0 +1,181 @@
+"""
+Reading the tail of the log file without loading all of it.
+
+tail() seeks to the end of the file and reads it backwards in blocks, so the last N
+lines cost a few blocks no matter how large the day's log has grown. LogFollower
+picks up lines appended since its last poll, for the live /logs/stream endpoint, and
+starts over on the new file when loguru rotates the log.
+
+Both can filter entries by minimum level, by [tag] (a site such as [stripe], or a
+component such as [Scrape]) and by time range. An entry is a header line in the
+LOG_FILE format ("2025-01-01 12:00:00 | INFO     | message") plus any lines after it
+without a header, such as a traceback; it is kept or dropped as a whole.
+"""
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+BLOCK_SIZE = 64 * 1024
+MAX_POLL_BYTES = 1024 * 1024  # a follower catches up on a burst over several polls
+
+HEADER_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \| (\w+)\s*\| (.*)$")
+# loguru's standard levels
+LEVELS = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+Header = Tuple[datetime, str, str]  # time, level, message
+
+
+def parse_header(line: str) -> Optional[Header]:
+    """(time, level, message) if line starts a log entry, else None."""
+    m = HEADER_RE.match(line)
+    if not m:
+        return None
+    try:
+        return datetime.strptime(m.group(1), "%Y-%m-%d %H:%M:%S"), m.group(2), m.group(3)
+    except ValueError:
+        return None
+
+
+class LogFilter:
+    """Which log entries to keep. Raises ValueError for an unknown level."""
+
+    def __init__(
+        self,
+        level: Optional[str] = None,
+        tag: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ):
+        if level and level.upper() not in LEVELS:
+            raise ValueError(f"Unknown level {level!r}; use one of {', '.join(LEVELS)}")
+        self.min_level = LEVELS[level.upper()] if level else None
+        self.tags = [f"[{t.strip().strip('[]').lower()}]" for t in tag.split(",") if t.strip()] if tag else []
+        # The log is written in local time without an offset
+        self.since = since.replace(tzinfo=None) if since else None
+        self.until = until.replace(tzinfo=None) if until else None
+
+    @property
+    def active(self) -> bool:
+        return bool(self.min_level or self.tags or self.since or self.until)
+
+    def matches(self, header: Header) -> bool:
+        time, level, message = header
+        if self.min_level and LEVELS.get(level, 0) < self.min_level:
+            return False
+        if self.since and time < self.since:
+            return False
+        if self.until and time > self.until:
+            return False
+        if self.tags:
+            lowered = message.lower()
+            return any(tag in lowered for tag in self.tags)
+        return True
+
+    def before_range(self, header: Header) -> bool:
+        """True once a backwards scan has passed `since`; nothing earlier can match."""
+        return self.since is not None and header[0] < self.since
+
+
+def _decode(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def read_reverse(path: Path, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """Lines of a file from the last to the first, reading only as many blocks as consumed."""
+    with path.open("rb") as f:
+        pos = f.seek(0, 2)
+        rest = b""
+        first = True
+        while pos > 0:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            lines = (f.read(size) + rest).split(b"\n")
+            rest = lines[0]
+            for line in reversed(lines[1:]):
+                if first and not line:  # the file's final newline
+                    first = False
+                    continue
+                first = False
+                yield _decode(line)
+        if rest or not first:
+            yield _decode(rest)
+
+
+def tail(path: Path, lines: int, log_filter: Optional[LogFilter] = None) -> str:
+    """The last `lines` lines of the entries that pass log_filter, oldest first."""
+    log_filter = log_filter or LogFilter()
+    kept: List[List[str]] = []  # newest entry first
+    count = 0
+    continuation: List[str] = []  # lines after a header, newest first, until the header is read
+
+    for line in read_reverse(path):
+        header = parse_header(line)
+        if header is None:
+            continuation.append(line)
+            continue
+        entry, continuation = [line] + continuation[::-1], []
+        if log_filter.before_range(header):
+            break
+        if log_filter.matches(header):
+            kept.append(entry)
+            count += len(entry)
+            if count >= lines:
+                break
+    else:
+        # Lines at the top of the file whose header rotated into the previous file
+        if continuation and not log_filter.active:
+            kept.append(continuation[::-1])
+
+    out = [line for entry in reversed(kept) for line in entry][-lines:] if lines > 0 else []
+    return "".join(f"{line}\n" for line in out)
+
+
+class LogFollower:
+    """Lines appended to a log file since the previous poll, filtered per entry."""
+
+    def __init__(self, path: Path, offset: Optional[int] = None, log_filter: Optional[LogFilter] = None):
+        self.path = path
+        self.log_filter = log_filter or LogFilter()
+        try:
+            stat = path.stat()
+            self._inode, size = stat.st_ino, stat.st_size
+        except FileNotFoundError:
+            self._inode, size = None, 0
+        # Resume at a previous offset if it still fits this file, else follow from the end
+        self.offset = offset if offset is not None and offset <= size else size
+        self._partial = b""
+        self._keep = not self.log_filter.active  # verdict for the entry being continued
+
+    @property
+    def position(self) -> int:
+        """Offset just past the last complete line returned; pass it back as `offset` to resume."""
+        return self.offset - len(self._partial)
+
+    def poll(self) -> List[str]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return []
+        if stat.st_ino != self._inode or stat.st_size < self.offset:
+            # Rotated (a new file under the same name) or truncated: read the new file from the start
+            self._inode, self.offset, self._partial = stat.st_ino, 0, b""
+        if stat.st_size == self.offset:
+            return []
+
+        with self.path.open("rb") as f:
+            f.seek(self.offset)
+            data = f.read(min(stat.st_size - self.offset, MAX_POLL_BYTES))
+        self.offset += len(data)
+        *complete, self._partial = (self._partial + data).split(b"\n")
+
+        out = []
+        for raw in complete:
+            line = _decode(raw)
+            header = parse_header(line)
+            if header is not None:
+                self._keep = self.log_filter.matches(header)
+            if self._keep:
+                out.append(line)
+        return out
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 import argparse
+import signal
+from pathlib import Path
+import redis
 import uvicorn
 from loguru import logger
 
-from backend.core import run_check_once
-from backend.api import app
-from backend.config import DESCRIPTION
+from backend.config import DESCRIPTION, REDIS_HOST, REDIS_PORT, SCRAPE_MAX_WORKERS
+from backend.state import state_store
 
 def main():
     parser = argparse.ArgumentParser(
@@ -30,10 +32,55 @@ def main():
         action="store_true",
         help="Enable auto-reload (useful for development)"
     )
+    parser.add_argument(
+        "--export-state",
+        type=Path,
+        metavar="PATH",
+        help="Write the seen state as jobs-seen.json compatible JSON to PATH and exit"
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Run as a scrape worker: take per-site tasks from the Redis queue instead of serving the API"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=SCRAPE_MAX_WORKERS,
+        help=f"Sites a worker scrapes at once (default SCRAPE_MAX_WORKERS, {SCRAPE_MAX_WORKERS})"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve a worker's Prometheus metrics on this port"
+    )
 
     args = parser.parse_args()
+    if args.export_state:
+        state_store.export_json(args.export_state)
+        return
+    if args.worker:
+        run_worker(args.concurrency, args.metrics_port)
+        return
+
+    from backend.api import app
     uvicorn.run(app, host=args.host, port=args.port, reload=args.reload, log_level="info")
 
 
+def run_worker(concurrency: int, metrics_port=None):
+    """Scrape tasks queued by the API's coordinator until SIGTERM or Ctrl-C."""
+    from backend.scrape_queue import ScrapeQueue, ScrapeWorker
+
+    if metrics_port:
+        from prometheus_client import start_http_server
+        start_http_server(metrics_port)
+    r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+    worker = ScrapeWorker(ScrapeQueue(r), concurrency=concurrency)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: worker.stop())
+    logger.info(f"[Start] Starting scrape worker (Redis {REDIS_HOST}:{REDIS_PORT})")
+    worker.run()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,126 @@
+"""
+Prometheus metrics for the scrape pipeline, on the default registry served at /metrics.
+
+Scrape timings are split per site and stage: fetch (download, incl. retries and
+rate limiting), parse (turning the payload into records), filter (field extraction
+is counted as parse; rules, title filter and de-duplication as filter), diff
+(against the seen state, plus the top-jobs index update) and total. The HTTP
+layer labels its metrics with the site being scraped on the current thread, see
+site_scope().
+
+Tracing is optional: with TRACING_ENABLED and opentelemetry-api installed, each
+stage also opens a span; any other tracer can be plugged in with set_span_hook().
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, ContextManager, Dict, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+try:
+    from opentelemetry import trace
+except ImportError:  # optional: tracing only
+    trace = None
+
+from backend.config import TRACING_ENABLED
+from backend.logger import logger
+
+UNKNOWN_SITE = "none"  # label for requests made outside a scrape
+
+scrape_counter = Counter("job_scrapes_total", "Total number of scrapes run by the background scheduler")
+scrape_duration = Histogram("job_scrape_duration_seconds", "Duration of scheduled job scrapes (seconds)")
+
+stage_seconds = Histogram(
+    "job_scrape_stage_seconds", "Time spent per site in each scrape stage (fetch, parse, filter, diff, total)",
+    ["site", "stage"], buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+response_bytes = Histogram(
+    "job_scrape_response_bytes", "Size of downloaded careers pages and API payloads",
+    ["site"], buckets=(1e3, 1e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7),
+)
+http_responses = Counter("job_scrape_http_responses_total", "HTTP responses received while scraping, by status", ["site", "status"])
+http_errors = Counter("job_scrape_http_errors_total", "Scrape requests that got no response, by error type", ["site", "error"])
+http_retries = Counter("job_scrape_http_retries_total", "Scrape requests retried after an error or retryable status", ["site"])
+http_cache = Counter("job_scrape_http_cache_total", "Conditional requests served from the HTTP cache (hit) or downloaded (miss)", ["site", "result"])
+site_results = Counter("job_scrape_site_results_total", "Outcome of each site per check (parsed, unchanged, failed)", ["site", "result"])
+jobs_found = Gauge("job_scrape_jobs_found", "Jobs found for a site by its last successful parse", ["site"])
+job_changes = Counter("job_scrape_job_changes_total", "Jobs that were new, updated or stale (gone) in a check", ["site", "change"])
+state_write_seconds = Histogram("job_state_write_seconds", "Time to persist the seen state after a check", ["backend"])
+alerts = Counter("job_alert_messages_total", "Alert deliveries from the outbox by sink and outcome (sent, retry, failed)", ["sink", "result"])
+scrape_tasks = Counter(
+    "job_scrape_tasks_total",
+    "Distributed scrape tasks by outcome, counted by the coordinator (done, requeued, abandoned, timeout)", ["result"],
+)
+
+_context = threading.local()
+
+
+@contextmanager
+def site_scope(site: str):
+    """Attribute HTTP metrics recorded on this thread to `site`."""
+    previous = getattr(_context, "site", None)
+    _context.site = site
+    try:
+        yield
+    finally:
+        _context.site = previous
+
+
+def current_site() -> str:
+    return getattr(_context, "site", None) or UNKNOWN_SITE
+
+
+# (span name, attributes) -> context manager
+_span_hook: Optional[Callable[[str, Dict], ContextManager]] = None
+
+
+def set_span_hook(hook: Optional[Callable[[str, Dict], ContextManager]]) -> None:
+    global _span_hook
+    _span_hook = hook
+
+
+def span(name: str, **attributes) -> ContextManager:
+    """A tracing span around a block, or a no-op when tracing is off."""
+    return _span_hook(name, attributes) if _span_hook else nullcontext()
+
+
+@contextmanager
+def stage(site: str, name: str):
+    """Time one stage of a site's scrape, inside a span when tracing is on."""
+    with span(f"scrape.{name}", site=site):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage_seconds.labels(site, name).observe(time.perf_counter() - start)
+
+
+class StageClock:
+    """
+    Splits a loop's wall time between stages that alternate per item, e.g. parsing
+    the next streamed record and filtering it. Call lap(stage) after each step.
+    """
+
+    def __init__(self, site: str):
+        self.site = site
+        self.totals: Dict[str, float] = defaultdict(float)
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.totals[stage] += now - self._last
+        self._last = now
+
+    def observe(self) -> None:
+        for name, seconds in self.totals.items():
+            stage_seconds.labels(self.site, name).observe(seconds)
+
+
+if TRACING_ENABLED:
+    if trace is not None:
+        _tracer = trace.get_tracer("job-scraper")
+        set_span_hook(lambda name, attributes: _tracer.start_as_current_span(name, attributes=attributes))
+    else:
+        logger.warning("[Metrics] TRACING_ENABLED is set but opentelemetry-api is not installed; spans are off")
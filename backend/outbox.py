@@ -0,0 +1,360 @@
+"""
+Durable alert outbox and the dispatcher that delivers it.
+
+alert() only enqueues: every message is stored in ALERT_OUTBOX_FILE (SQLite) once
+per sink, so a check never waits on a mail server and a message survives a crash
+or restart until it is delivered. The dispatcher thread claims due messages in
+batches under a short lease (API workers can share the file), sends them, and
+reschedules failures with jittered exponential backoff. After ALERT_MAX_ATTEMPTS a
+message is kept as failed for inspection.
+
+Sinks:
+- email: one SMTP connection that stays open across messages and batches
+  (STARTTLS and login happen once), closed after SMTP_IDLE_SECONDS unused.
+  For local testing, point SMTP_HOST/SMTP_PORT at a stand-in such as
+  `python -m aiosmtpd -n -l localhost:1025` with SMTP_STARTTLS=false.
+- webhooks: a JSON POST per message to each of ALERT_WEBHOOK_URLS over a pooled session.
+"""
+import hashlib
+import json
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from backend.config import (
+    GMAIL_SENDER, GMAIL_PASSWD, ALERT_RECIPIENT, USER_AGENT, ALERT_OUTBOX_FILE,
+    SMTP_HOST, SMTP_PORT, SMTP_STARTTLS, SMTP_IDLE_SECONDS, ALERT_WEBHOOK_URLS,
+    ALERT_BATCH_SIZE, ALERT_MAX_ATTEMPTS, ALERT_RETRY_BASE, ALERT_RETRY_MAX,
+)
+from backend import metrics
+from backend.logger import logger
+
+CLAIM_LEASE_SECONDS = 5 * 60  # a claimed message goes back to the queue if its dispatcher dies
+IDLE_POLL_SECONDS = 30        # look for due messages at least this often
+
+
+@dataclass
+class OutboxMessage:
+    id: int
+    sink: str
+    subject: str
+    body: str
+    payload: Dict
+    attempts: int
+
+
+class AlertOutbox:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sink TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            body TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',  -- pending, sent or failed
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            locked_until REAL,
+            last_error TEXT,
+            sent_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._initialised = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialised:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: claims take the write lock explicitly with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._initialised:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            self._initialised = True
+        return conn
+
+    def enqueue(self, subject: str, body: str, payload: Dict, sinks: Iterable[str]) -> int:
+        """Store a message once per sink. Returns the number of rows queued."""
+        now = datetime.now().isoformat(timespec="seconds")
+        rows = [(sink, subject, body, json.dumps(payload, ensure_ascii=False), now, time.time()) for sink in sinks]
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "INSERT INTO outbox (sink, subject, body, payload, created_at, next_attempt_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        finally:
+            conn.close()
+        return len(rows)
+
+    def claim(self, sinks: Iterable[str], limit: int, lease: float = CLAIM_LEASE_SECONDS) -> List[OutboxMessage]:
+        """Lease up to `limit` due messages for `sinks`, oldest first."""
+        sinks = list(sinks)
+        if not sinks:
+            return []
+        now = time.time()
+        placeholders = ",".join("?" * len(sinks))
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                f"SELECT id, sink, subject, body, payload, attempts FROM outbox "
+                f"WHERE status = 'pending' AND sink IN ({placeholders}) AND next_attempt_at <= ? "
+                f"AND (locked_until IS NULL OR locked_until <= ?) ORDER BY id LIMIT ?",
+                (*sinks, now, now, limit),
+            ).fetchall()
+            conn.executemany("UPDATE outbox SET locked_until = ? WHERE id = ?", ((now + lease, row[0]) for row in rows))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return [OutboxMessage(id, sink, subject, body, json.loads(payload), attempts)
+                for id, sink, subject, body, payload, attempts in rows]
+
+    def mark_sent(self, message: OutboxMessage) -> None:
+        self._update(
+            "UPDATE outbox SET status = 'sent', attempts = attempts + 1, locked_until = NULL, sent_at = ? WHERE id = ?",
+            (datetime.now().isoformat(timespec="seconds"), message.id),
+        )
+
+    def mark_failed(self, message: OutboxMessage, error: str, retry_at: Optional[float]) -> None:
+        """Record a failed attempt: retry at `retry_at`, or give up if it is None."""
+        if retry_at is None:
+            self._update(
+                "UPDATE outbox SET status = 'failed', attempts = attempts + 1, locked_until = NULL, last_error = ? WHERE id = ?",
+                (error, message.id),
+            )
+        else:
+            self._update(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, locked_until = NULL, last_error = ? WHERE id = ?",
+                (retry_at, error, message.id),
+            )
+
+    def _update(self, sql: str, params) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(sql, params)
+        finally:
+            conn.close()
+
+    def next_due(self, sinks: Iterable[str]) -> Optional[float]:
+        """When the next pending message for `sinks` can be claimed, as a time.time() value."""
+        sinks = list(sinks)
+        if not sinks:
+            return None
+        conn = self._connect()
+        try:
+            (due,) = conn.execute(
+                f"SELECT MIN(MAX(next_attempt_at, COALESCE(locked_until, 0))) FROM outbox "
+                f"WHERE status = 'pending' AND sink IN ({','.join('?' * len(sinks))})",
+                sinks,
+            ).fetchone()
+        finally:
+            conn.close()
+        return due
+
+    def counts(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        finally:
+            conn.close()
+
+
+def _to_ascii(s: str) -> str:
+    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+
+
+class EmailSink:
+    """Sends over one SMTP connection, reopened only when the server drops it or it idles out."""
+
+    name = "email"
+
+    def __init__(
+        self, host: str = SMTP_HOST, port: int = SMTP_PORT, starttls: bool = SMTP_STARTTLS,
+        sender: Optional[str] = GMAIL_SENDER, password: Optional[str] = GMAIL_PASSWD,
+        recipient: Optional[str] = ALERT_RECIPIENT, idle_seconds: float = SMTP_IDLE_SECONDS,
+    ):
+        self.host, self.port, self.starttls = host, port, starttls
+        self.sender, self.password, self.recipient = sender, password, recipient
+        self.idle_seconds = idle_seconds
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._server is None:
+            server = smtplib.SMTP(self.host, self.port, timeout=30)
+            try:
+                if self.starttls:
+                    server.starttls()
+                if self.password:
+                    server.login(self.sender, self.password)
+            except Exception:
+                server.close()
+                raise
+            self._server = server
+            logger.debug(f"[Email] Connected to {self.host}:{self.port}")
+        return self._server
+
+    def send(self, message: OutboxMessage) -> None:
+        to = _to_ascii(self.recipient)
+        mail = f"To: {to}\r\nFrom: {self.sender}\r\nSubject: {_to_ascii(message.subject)}\r\n{_to_ascii(message.body)}"
+        try:
+            try:
+                self._connection().sendmail(self.sender, to, mail)
+            except smtplib.SMTPServerDisconnected:
+                # The server closed the kept-open connection: reconnect once
+                self._server = None
+                self._connection().sendmail(self.sender, to, mail)
+        except Exception:
+            self.close()
+            raise
+        self._last_used = time.monotonic()
+
+    def idle(self) -> None:
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            self.close()
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
+
+
+class WebhookSink:
+    """POSTs each message as JSON: subject, text, total_new and new_jobs per site."""
+
+    def __init__(self, url: str):
+        self.url = url
+        # Webhook URLs often embed a token; name the sink by a hash so it stays out of logs and the outbox
+        self.name = f"webhook-{hashlib.sha256(url.encode('utf-8')).hexdigest()[:8]}"
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+
+    def send(self, message: OutboxMessage) -> None:
+        body = {"subject": message.subject, "text": f"{message.subject}\n\n{message.body}", **message.payload}
+        # requests' errors quote the URL; keep its token out of the logs and the outbox
+        try:
+            response = self.session.post(self.url, json=body, timeout=(5, 15))
+        except requests.RequestException as e:
+            raise ConnectionError(f"{type(e).__name__} posting to {self.name}") from None
+        if response.status_code >= 400:
+            raise ConnectionError(f"{self.name} answered {response.status_code} {response.reason}")
+
+    def idle(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def make_sinks() -> Dict[str, object]:
+    sinks = {}
+    if GMAIL_SENDER and ALERT_RECIPIENT:
+        sinks[EmailSink.name] = EmailSink()
+    else:
+        logger.warning("[Email] GMAIL_SENDER or ALERT_RECIPIENT is not set; email alerts are off")
+    for url in ALERT_WEBHOOK_URLS:
+        sink = WebhookSink(url)
+        sinks[sink.name] = sink
+    return sinks
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before the next try of a message that has failed `attempts` times."""
+    return min(ALERT_RETRY_MAX, ALERT_RETRY_BASE * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+class AlertDispatcher:
+    """Background thread that drains the outbox into the sinks."""
+
+    def __init__(self, outbox: AlertOutbox, sinks: Dict[str, object]):
+        self.outbox = outbox
+        self.sinks = sinks
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None or not self.sinks:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+        logger.info(f"[Alerts] Dispatching to {', '.join(self.sinks)}")
+
+    def stop(self, timeout: float = 5) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+        for sink in self.sinks.values():
+            sink.close()
+
+    def wake(self) -> None:
+        """Check for due messages now rather than at the next poll."""
+        self._wake.set()
+
+    def dispatch_once(self) -> int:
+        """Send one batch of due messages. Returns how many were attempted."""
+        batch = self.outbox.claim(self.sinks, ALERT_BATCH_SIZE)
+        for message in batch:
+            try:
+                self.sinks[message.sink].send(message)
+            except Exception as e:
+                attempts = message.attempts + 1
+                error = f"{type(e).__name__}: {e}"
+                if attempts >= ALERT_MAX_ATTEMPTS:
+                    logger.error(f"[Alerts] Giving up on message {message.id} to {message.sink} after {attempts} attempts: {error}")
+                    self.outbox.mark_failed(message, error, None)
+                    metrics.alerts.labels(message.sink, "failed").inc()
+                else:
+                    delay = retry_delay(attempts)
+                    logger.warning(f"[Alerts] Sending message {message.id} to {message.sink} failed ({error}); retry in {delay:.0f}s")
+                    self.outbox.mark_failed(message, error, time.time() + delay)
+                    metrics.alerts.labels(message.sink, "retry").inc()
+                continue
+            self.outbox.mark_sent(message)
+            metrics.alerts.labels(message.sink, "sent").inc()
+            logger.info(f"[Alerts] Sent message {message.id} to {message.sink}: {message.subject}")
+        return len(batch)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.dispatch_once():
+                    continue  # there may be more due right away
+                for sink in self.sinks.values():
+                    sink.idle()
+                due = self.outbox.next_due(self.sinks)
+            except Exception as e:
+                logger.exception(f"[Alerts] Dispatcher error: {e}")
+                due = None
+            wait = IDLE_POLL_SECONDS if due is None else min(IDLE_POLL_SECONDS, max(0.0, due - time.time()))
+            self._wake.wait(wait)
+            self._wake.clear()
+
+
+outbox = AlertOutbox(ALERT_OUTBOX_FILE)
+dispatcher = AlertDispatcher(outbox, make_sinks())
@@ -0,0 +1,223 @@
+"""
+Resilience layer in front of the scrape HTTP client.
+
+Every request goes through:
+- a token bucket per host, so a check never hits one host faster than
+  HTTP_RATE_PER_HOST, however many sites it serves;
+- a circuit breaker per site and host: after CIRCUIT_FAILURE_THRESHOLD failed
+  requests in a row the site's requests to that host are skipped outright for
+  CIRCUIT_RESET_SECONDS, then get one trial request without retries, so a dead
+  site costs one attempt per check instead of the full retry schedule. Sites on a
+  shared host (every Greenhouse board is on api.greenhouse.io) trip and recover
+  independently: one broken board neither hides behind its neighbours' successes
+  nor blocks them;
+- retries of connection errors, timeouts and 429/5xx responses with exponential
+  backoff and full jitter, honoring Retry-After up to HTTP_BACKOFF_MAX. A server
+  asking for a longer wait gets no retry, and no retry starts once the request
+  has used up SCRAPE_SITE_TIMEOUT, since the check has given up on the site by then.
+
+Client errors (404, 403, ...) are returned immediately and don't count against
+the circuit, since they say nothing about whether the site is up.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from backend.config import (
+    HTTP_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX, HTTP_RATE_PER_HOST,
+    HTTP_RATE_BURST, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, SCRAPE_SITE_TIMEOUT,
+)
+from backend import metrics
+from backend.logger import logger
+
+RETRYABLE_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class CircuitOpen(Exception):
+    """A site's requests to a host are being skipped because they kept failing."""
+
+
+class TokenBucket:
+    """Allow `rate` requests per second on average with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available and take it."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """closed -> open after `threshold` consecutive failures -> half-open after `reset` seconds."""
+
+    def __init__(self, name: str, threshold: int, reset: float):
+        self.name = name  # "site@host"
+        self.threshold = threshold
+        self.reset = reset
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset:
+            return "half-open"
+        return "open"
+
+    def before_request(self) -> bool:
+        """
+        Raise CircuitOpen if the request should be skipped. Returns True when this
+        request is the half-open trial, which must not be retried.
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return False
+            if state == "open" or self._trial_running:
+                remaining = self.reset - (time.monotonic() - self.opened_at)
+                raise CircuitOpen(f"{self.name} failed {self.failures} times in a row; skipping for {max(0, remaining):.0f}s")
+            self._trial_running = True
+            return True
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            self._trial_running = False
+            if success:
+                if self.opened_at is not None:
+                    logger.info(f"[HTTP] {self.name} recovered; circuit closed")
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logger.warning(f"[HTTP] {self.name} failed {self.failures} times in a row; circuit open for {self.reset:.0f}s")
+                self.opened_at = time.monotonic()
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """The server's Retry-After as seconds from now, or None if absent/unparseable."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry (0-based)."""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt))
+
+
+class ResilientClient:
+    """Wraps a client from backend.http_client with retries, rate limits and circuit breakers."""
+
+    def __init__(self, client):
+        self.client = client
+        self._buckets: Dict[str, TokenBucket] = {}                  # per host
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}  # per (site, host)
+        self._lock = threading.Lock()
+
+    def _request_state(self, site: str, url: str) -> Tuple[TokenBucket, CircuitBreaker]:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(HTTP_RATE_PER_HOST, HTTP_RATE_BURST)
+            breaker = self._breakers.get((site, host))
+            if breaker is None:
+                breaker = self._breakers[(site, host)] = CircuitBreaker(
+                    f"{site}@{host}", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS,
+                )
+            return bucket, breaker
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, stream: bool = False, **kwargs) -> requests.Response:
+        site = metrics.current_site()
+        bucket, breaker = self._request_state(site, url)
+        try:
+            trial = breaker.before_request()
+        except CircuitOpen:
+            metrics.http_errors.labels(site, CircuitOpen.__name__).inc()
+            raise
+        retries = 0 if trial else HTTP_RETRIES
+        deadline = time.monotonic() + SCRAPE_SITE_TIMEOUT
+
+        def out_of_time(wait: float) -> bool:
+            return time.monotonic() + wait >= deadline
+
+        for attempt in range(retries + 1):
+            bucket.acquire()
+            try:
+                response = self.client.get(url, headers=headers, stream=stream, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.http_errors.labels(site, type(e).__name__).inc()
+                wait = backoff_seconds(attempt)
+                if attempt == retries or out_of_time(wait):
+                    breaker.record(success=False)
+                    raise
+                logger.debug(f"[HTTP] {url} failed ({e}); retry {attempt + 1}/{retries} in {wait:.1f}s")
+                metrics.http_retries.labels(site).inc()
+                time.sleep(wait)
+                continue
+            except Exception as e:
+                metrics.http_errors.labels(site, type(e).__name__).inc()
+                breaker.record(success=False)
+                raise
+
+            metrics.http_responses.labels(site, str(response.status_code)).inc()
+            if response.status_code not in RETRYABLE_STATUSES:
+                breaker.record(success=True)
+                return response
+
+            wait = retry_after_seconds(response)
+            wait = backoff_seconds(attempt) if wait is None else wait
+            if attempt == retries or wait > HTTP_BACKOFF_MAX or out_of_time(wait):
+                breaker.record(success=False)
+                return response  # the caller's raise_for_status reports it
+            logger.debug(f"[HTTP] {url} returned {response.status_code}; retry {attempt + 1}/{retries} in {wait:.1f}s")
+            metrics.http_retries.labels(site).inc()
+            response.close()
+            time.sleep(wait)
+
+    def circuits(self) -> Dict[str, str]:
+        """Circuit state per "site@host" that has been contacted."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.state for breaker in breakers}
+
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,365 @@
+"""
+Distributed scraping: per-site tasks on a Redis queue, scraped by worker processes.
+
+With SCRAPE_MODE=distributed, the API worker holding the scrape lock coordinates each
+check: it queues one task per site (with the site's last fingerprint), collects the
+results workers write back and hands them to run_check_once, which diffs, alerts,
+commits the state and builds the views exactly as after a local scrape. The seen state
+keeps a single writer, and workers need nothing but Redis and the scrapers. Start them
+on any node with `python -m backend.main --worker`.
+
+Claims are leases. A claim moves a task into a hash of claimed sites and a sorted set of
+lease expiries in one script, and a site that is still claimed stays queued, so two
+workers never hold the same site. The worker's heartbeat renews its leases while a
+scrape runs (for up to SCRAPE_SITE_TIMEOUT). When a lease lapses, e.g. because its
+worker died, the coordinator queues the task again, up to SCRAPE_TASK_MAX_ATTEMPTS, and
+a late result from the old claim is dropped. Lease times come from the Redis clock, so
+nodes' clocks don't have to agree.
+
+If no worker has sent a heartbeat within a lease, the coordinator scrapes locally.
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import redis
+
+from backend.config import (
+    SCRAPE_MAX_WORKERS, SCRAPE_SITE_TIMEOUT, SCRAPE_TASK_LEASE_SECONDS, SCRAPE_TASK_MAX_ATTEMPTS, SCRAPE_RUN_TIMEOUT,
+)
+from backend.core import ScrapeResult, _scrape_site, scrape_all
+from backend.logger import logger
+from backend.scrapers import SCRAPERS
+from backend import metrics
+
+QUEUE_KEY = "scrape:queue"             # tasks waiting for a worker (list)
+CLAIMS_KEY = "scrape:claims"           # claimed site -> lease expiry in ms (sorted set)
+CLAIMED_KEY = "scrape:claimed"         # claimed site -> the task it was claimed for (hash)
+WORKERS_KEY = "scrape:workers"         # worker id -> last heartbeat in ms (sorted set)
+RESULTS_KEY = "scrape:results:{run}"   # results of one check, in the order they arrive (list)
+RESULTS_TTL_SECONDS = 60 * 60
+POLL_SECONDS = 1.0                     # how often an idle worker looks for tasks, and the coordinator for lapsed leases
+
+# Milliseconds on the Redis server's clock
+_NOW_MS = "local t = redis.call('TIME') local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)\n"
+
+# KEYS: queue, claims, claimed; ARGV: lease ms. Skips (and requeues) tasks for sites already claimed.
+CLAIM_SCRIPT = _NOW_MS + """
+for _ = 1, redis.call('LLEN', KEYS[1]) do
+    local task = redis.call('LPOP', KEYS[1])
+    local site = cjson.decode(task)['site']
+    if redis.call('HEXISTS', KEYS[3], site) == 0 then
+        redis.call('ZADD', KEYS[2], now + tonumber(ARGV[1]), site)
+        redis.call('HSET', KEYS[3], site, task)
+        return task
+    end
+    redis.call('RPUSH', KEYS[1], task)
+end
+return false
+"""
+
+# KEYS: claims, claimed; ARGV: lease ms, site, task
+RENEW_SCRIPT = _NOW_MS + """
+if redis.call('HGET', KEYS[2], ARGV[2]) ~= ARGV[3] then return 0 end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[1]), ARGV[2])
+return 1
+"""
+
+# KEYS: claims, claimed, results; ARGV: site, task, result, results ttl
+COMPLETE_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('RPUSH', KEYS[3], ARGV[3])
+redis.call('EXPIRE', KEYS[3], ARGV[4])
+return 1
+"""
+
+# KEYS: claims, claimed, queue; ARGV: site, task. Hands an unfinished task back to the queue.
+RELEASE_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('LPUSH', KEYS[3], ARGV[2])
+return 1
+"""
+
+# KEYS: claims, claimed. Drops every lapsed claim and returns its task.
+REAP_SCRIPT = _NOW_MS + """
+local tasks = {}
+for _, site in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now)) do
+    local task = redis.call('HGET', KEYS[2], site)
+    if task then table.insert(tasks, task) end
+    redis.call('ZREM', KEYS[1], site)
+    redis.call('HDEL', KEYS[2], site)
+end
+return tasks
+"""
+
+# KEYS: workers; ARGV: worker id (empty to only count), liveness window ms. Returns live workers.
+WORKERS_SCRIPT = _NOW_MS + """
+if ARGV[1] ~= '' then redis.call('ZADD', KEYS[1], now, ARGV[1]) end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[2]))
+return redis.call('ZCARD', KEYS[1])
+"""
+
+
+class RemoteScrapeError(Exception):
+    """A site's scrape failed on a worker; the message is the worker's error."""
+
+
+class Task(NamedTuple):
+    run: str                     # the check this task belongs to
+    site: str
+    fingerprint: Optional[str]   # the site's fingerprint in the seen state
+    attempt: int = 1
+
+    def encode(self) -> str:
+        return json.dumps(self._asdict())
+
+    @classmethod
+    def decode(cls, raw: str) -> "Task":
+        return cls(**json.loads(raw))
+
+
+class ScrapeQueue:
+    """The Redis side of distributed scraping, used by the coordinator and the workers."""
+
+    def __init__(self, r: redis.Redis, lease: float = SCRAPE_TASK_LEASE_SECONDS):
+        self.r = r  # needs decode_responses=True
+        self.lease = lease
+        self._claim = r.register_script(CLAIM_SCRIPT)
+        self._renew = r.register_script(RENEW_SCRIPT)
+        self._complete = r.register_script(COMPLETE_SCRIPT)
+        self._release = r.register_script(RELEASE_SCRIPT)
+        self._reap = r.register_script(REAP_SCRIPT)
+        self._workers = r.register_script(WORKERS_SCRIPT)
+
+    @property
+    def _lease_ms(self) -> int:
+        return int(self.lease * 1000)
+
+    # Coordinator
+
+    def start_run(self, tasks: List[Task]) -> None:
+        """Queue a check's tasks, dropping any left over from a check that never finished."""
+        pipe = self.r.pipeline(transaction=True)
+        pipe.delete(QUEUE_KEY)
+        if tasks:
+            pipe.rpush(QUEUE_KEY, *(task.encode() for task in tasks))
+        pipe.execute()
+
+    def finish_run(self, run: str) -> None:
+        self.r.delete(QUEUE_KEY, RESULTS_KEY.format(run=run))
+
+    def requeue(self, task: Task) -> None:
+        self.r.lpush(QUEUE_KEY, task.encode())
+
+    def reap(self) -> List[Task]:
+        """Tasks whose lease lapsed; they are no longer claimed."""
+        return [Task.decode(raw) for raw in self._reap(keys=[CLAIMS_KEY, CLAIMED_KEY])]
+
+    def next_result(self, run: str, timeout: float) -> Optional[Dict]:
+        reply = self.r.blpop([RESULTS_KEY.format(run=run)], timeout=max(timeout, 0.01))
+        return json.loads(reply[1]) if reply else None
+
+    def live_workers(self) -> int:
+        return self._workers(keys=[WORKERS_KEY], args=["", self._lease_ms])
+
+    # Workers
+
+    def register(self, worker_id: str) -> int:
+        return self._workers(keys=[WORKERS_KEY], args=[worker_id, self._lease_ms])
+
+    def claim(self) -> Optional[str]:
+        """The next task whose site no other worker holds, as stored, or None."""
+        return self._claim(keys=[QUEUE_KEY, CLAIMS_KEY, CLAIMED_KEY], args=[self._lease_ms])
+
+    def renew(self, raw: str, task: Task) -> bool:
+        """Extend a claim's lease. False if it was lost, i.e. it lapsed and was reaped."""
+        return bool(self._renew(keys=[CLAIMS_KEY, CLAIMED_KEY], args=[self._lease_ms, task.site, raw]))
+
+    def complete(self, raw: str, task: Task, result: Dict) -> bool:
+        """Deliver a result if the claim is still held. False if it was dropped."""
+        return bool(self._complete(
+            keys=[CLAIMS_KEY, CLAIMED_KEY, RESULTS_KEY.format(run=task.run)],
+            args=[task.site, raw, json.dumps(result), RESULTS_TTL_SECONDS],
+        ))
+
+    def release(self, raw: str, task: Task) -> bool:
+        return bool(self._release(keys=[CLAIMS_KEY, CLAIMED_KEY, QUEUE_KEY], args=[task.site, raw]))
+
+
+def _scrape_result(reply: Dict) -> ScrapeResult:
+    if reply.get("error"):
+        return ScrapeResult(error=RemoteScrapeError(f"{reply['error']} (on {reply.get('worker')})"))
+    return ScrapeResult(jobs=reply.get("jobs"), fingerprint=reply.get("fingerprint"), unchanged=reply.get("unchanged", False))
+
+
+def scrape_distributed(
+    queue: ScrapeQueue,
+    scrapers: Dict[str, Callable[[], List[Dict]]],
+    fingerprints: Optional[Dict[str, str]] = None,
+) -> Dict[str, ScrapeResult]:
+    """
+    Have workers scrape every site in `scrapers`; a drop-in for scrape_all. Sites with
+    no result within SCRAPE_RUN_TIMEOUT come back as timed out.
+    """
+    if not scrapers:
+        return {}
+    fingerprints = fingerprints or {}
+    workers = queue.live_workers()
+    if not workers:
+        logger.warning("[Queue] No scrape workers alive; scraping locally")
+        return scrape_all(scrapers, fingerprints)
+
+    run = uuid.uuid4().hex
+    queue.start_run([Task(run, site, fingerprints.get(site)) for site in scrapers])
+    logger.info(f"[Queue] Queued {len(scrapers)} sites for {workers} worker(s), run {run[:8]}")
+
+    results: Dict[str, ScrapeResult] = {}
+    deadline = time.monotonic() + SCRAPE_RUN_TIMEOUT
+    next_reap = time.monotonic() + POLL_SECONDS
+    try:
+        while len(results) < len(scrapers) and time.monotonic() < deadline:
+            reply = queue.next_result(run, min(POLL_SECONDS, deadline - time.monotonic()))
+            if reply is not None and reply["site"] in scrapers:
+                results[reply["site"]] = _scrape_result(reply)
+                metrics.scrape_tasks.labels("done").inc()
+                logger.debug(f"[Queue] {reply['site']} scraped by {reply.get('worker')} in {reply.get('seconds')}s")
+            if time.monotonic() < next_reap:
+                continue
+            next_reap = time.monotonic() + POLL_SECONDS
+            for task in queue.reap():
+                if task.run != run or task.site in results:
+                    continue  # a claim from an earlier check; nothing waits for it
+                if task.attempt >= SCRAPE_TASK_MAX_ATTEMPTS:
+                    results[task.site] = ScrapeResult(error=TimeoutError(f"worker lease lapsed {task.attempt} times"))
+                    metrics.scrape_tasks.labels("abandoned").inc()
+                    continue
+                logger.warning(f"[Queue] Lease on {task.site} lapsed (attempt {task.attempt}); queueing it again")
+                queue.requeue(task._replace(attempt=task.attempt + 1))
+                metrics.scrape_tasks.labels("requeued").inc()
+    finally:
+        queue.finish_run(run)
+
+    missing = [site for site in scrapers if site not in results]
+    if missing:
+        logger.warning(f"[Queue] No result within {SCRAPE_RUN_TIMEOUT:.0f}s for {', '.join(missing)}")
+        metrics.scrape_tasks.labels("timeout").inc(len(missing))
+    # In `scrapers` order, like scrape_all
+    return {
+        site: results.get(site) or ScrapeResult(error=TimeoutError(f"no worker result within {SCRAPE_RUN_TIMEOUT:.0f}s"))
+        for site in scrapers
+    }
+
+
+class ScrapeWorker:
+    """Claims site tasks from the queue and scrapes up to `concurrency` of them at once."""
+
+    def __init__(
+        self,
+        queue: ScrapeQueue,
+        scrapers: Dict[str, Callable[[], List[Dict]]] = SCRAPERS,
+        concurrency: int = SCRAPE_MAX_WORKERS,
+        worker_id: Optional[str] = None,
+    ):
+        self.queue = queue
+        self.scrapers = scrapers
+        self.concurrency = max(1, concurrency)
+        self.id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self._in_flight: Dict[str, Tuple[Task, float]] = {}  # raw task -> (task, start)
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+
+    def run(self) -> None:
+        """Claim and scrape until stop(); unfinished claims then go back to the queue."""
+        logger.info(f"[Worker] {self.id} scraping up to {self.concurrency} sites at once")
+        heartbeat = threading.Thread(target=self._heartbeat, name="scrape-heartbeat", daemon=True)
+        heartbeat.start()
+        while not self._stop.is_set():
+            with self._changed:
+                if len(self._in_flight) >= self.concurrency:
+                    self._changed.wait(POLL_SECONDS)
+                    continue
+            try:
+                raw = self.queue.claim()
+            except redis.RedisError as e:
+                logger.warning(f"[Worker] Could not claim a task: {e}")
+                raw = None
+            if raw is None:
+                self._stop.wait(POLL_SECONDS)
+                continue
+            task = Task.decode(raw)
+            with self._changed:
+                self._in_flight[raw] = (task, time.monotonic())
+            threading.Thread(target=self._scrape, args=(raw, task), name=f"scrape-{task.site}", daemon=True).start()
+
+        heartbeat.join()
+        with self._changed:
+            unfinished, self._in_flight = list(self._in_flight.items()), {}
+        for raw, (task, _) in unfinished:
+            try:
+                self.queue.release(raw, task)
+            except redis.RedisError:
+                pass  # its lease lapses instead
+        logger.info(f"[Worker] {self.id} stopped; handed back {len(unfinished)} unfinished tasks")
+
+    def _scrape(self, raw: str, task: Task) -> None:
+        start = time.monotonic()
+        try:
+            source = self.scrapers.get(task.site)
+            if source is None:
+                raise LookupError(f"{task.site} is not in this worker's registry")
+            result = _scrape_site(task.site, source, task.fingerprint)
+            reply = {"site": task.site, "jobs": result.jobs, "fingerprint": result.fingerprint, "unchanged": result.unchanged}
+        except Exception as e:
+            logger.exception(f"[Worker] Error scraping {task.site}: {e}")
+            reply = {"site": task.site, "error": f"{type(e).__name__}: {e}"}
+        reply.update(worker=self.id, seconds=round(time.monotonic() - start, 3))
+
+        with self._changed:
+            self._in_flight.pop(raw, None)
+            self._changed.notify_all()
+        try:
+            delivered = self.queue.complete(raw, task, reply)
+        except redis.RedisError as e:
+            logger.warning(f"[Worker] Could not deliver the result for {task.site}: {e}")
+            return
+        if delivered:
+            logger.info(f"[{task.site}] scraped in {reply['seconds']:.2f}s for run {task.run[:8]}")
+        else:
+            logger.warning(f"[Worker] Lease on {task.site} lapsed before it finished; result dropped")
+
+    def _heartbeat(self) -> None:
+        """Mark this worker alive and renew the leases of running scrapes."""
+        while True:
+            try:
+                self.queue.register(self.id)
+                with self._changed:
+                    running = list(self._in_flight.items())
+                for raw, (task, start) in running:
+                    if time.monotonic() - start > SCRAPE_SITE_TIMEOUT:
+                        # Let the lease lapse so the coordinator can give the site to another worker
+                        logger.warning(f"[Worker] {task.site} took over {SCRAPE_SITE_TIMEOUT:.0f}s; giving up its lease")
+                    elif self.queue.renew(raw, task):
+                        continue
+                    else:
+                        logger.warning(f"[Worker] Lost the lease on {task.site}")
+                    # Free the slot; the scrape finishes in the background and its result is dropped
+                    with self._changed:
+                        self._in_flight.pop(raw, None)
+                        self._changed.notify_all()
+            except redis.RedisError as e:
+                logger.warning(f"[Worker] Heartbeat failed: {e}")
+            if self._stop.wait(self.queue.lease / 3):
+                return
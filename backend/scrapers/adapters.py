@@ -0,0 +1,332 @@
+"""
+Reusable scraper engines for declaratively configured sources.
+
+Every adapter runs the same pipeline: fetch the page or API (HTTP cache and site
+fingerprint included), turn it into raw records, pull the job fields out of each
+record, apply the source's rules and the global title filter, format, and
+de-duplicate. Adapters only differ in how records and fields are found:
+
+    json        items of a JSON array (streamed), fields by dotted path
+    greenhouse  json preset for Greenhouse board APIs, metadata exposed as meta.<name>
+    lever       json preset for the Lever postings API
+    html        elements matched by a CSS selector, fields by selector (+ attribute)
+
+See sources.toml for the options each one takes.
+"""
+import importlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from bs4 import SoupStrainer
+
+from backend import metrics
+from backend.filters import EXCLUDED_TITLES, KeywordMatcher
+from backend.logger import logger
+from backend.scrapers.collector import JobCollector
+from backend.scrapers.parsing import css_class, parse_html
+from backend.utils import fetch_body, iter_json_items
+
+FIELDS = ("title", "link", "location", "category")
+
+
+class SourceConfigError(ValueError):
+    """A source entry in the registry is missing options or uses unknown ones."""
+
+
+def load_callable(path: str) -> Callable:
+    """Resolve "package.module:function" to the function."""
+    module, _, attr = path.partition(":")
+    if not module or not attr:
+        raise SourceConfigError(f"Expected 'module:function', got {path!r}")
+    return getattr(importlib.import_module(module), attr)
+
+
+def get_path(record: Any, path: str) -> Any:
+    """Follow a dotted path ("location.name") through nested dicts; None if absent."""
+    node = record
+    for key in path.split("."):
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    return node
+
+
+def _clean(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, list):
+        return [v.strip() if isinstance(v, str) else v for v in value]
+    return value
+
+
+def _values(value: Any) -> List[str]:
+    """A field value as a list of strings, so rules treat lists as "any element"."""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value if v is not None]
+    return [str(value)]
+
+
+class Rule:
+    """
+    One filter on one extracted field: `matches` (whole-word keywords), `equals` (exact,
+    case-insensitive) or `contains` (substring, case-insensitive). A rule passes
+    when any value of the field satisfies it.
+    """
+
+    def __init__(self, field: str, matches=None, equals=None, contains=None):
+        if sum(x is not None for x in (matches, equals, contains)) != 1:
+            raise SourceConfigError(f"Rule on {field!r} needs exactly one of matches, equals, contains")
+        self.field = field
+        self._matcher = KeywordMatcher(matches) if matches is not None else None
+        self._equals = frozenset(v.lower() for v in equals) if equals is not None else None
+        self._contains = [v.lower() for v in contains] if contains is not None else None
+
+    def __call__(self, job: Dict[str, Any]) -> bool:
+        for value in _values(job.get(self.field)):
+            if self._matcher is not None and self._matcher.search(value):
+                return True
+            lowered = value.lower()
+            if self._equals is not None and lowered in self._equals:
+                return True
+            if self._contains is not None and any(term in lowered for term in self._contains):
+                return True
+        return False
+
+
+def _rules(entries: Iterable[Dict]) -> List[Rule]:
+    return [Rule(**entry) for entry in entries]
+
+
+class Source:
+    """
+    A configured source. Calling it scrapes the site and returns its jobs, so a
+    source can be used anywhere a scraper function is.
+    """
+
+    adapter = ""
+    defaults: Dict[str, Any] = {}
+
+    def __init__(self, name: str, options: Dict[str, Any]):
+        self.name = name
+        # Field mappings extend the adapter's, everything else replaces it
+        self.config = {
+            **self.defaults, **options,
+            "fields": {**self.defaults.get("fields", {}), **options.get("fields", {})},
+        }
+        config = self.config
+        self.label = config.get("label") or name.capitalize()
+        self.url = config.get("url") or self.default_url()
+        if not self.url:
+            raise SourceConfigError(f"Source {name!r} has no url")
+        self.headers = config.get("headers")
+        self.base_url = config.get("base_url", "")
+
+        self.field_defaults: Dict[str, Any] = config.get("defaults", {})
+        self.require = _rules(config.get("require", []))
+        self.require_any = _rules(config.get("require_any", []))
+        self.exclude = _rules(config.get("exclude", []))
+        self.formatters = {field: load_callable(path) for field, path in config.get("format", {}).items()}
+
+    def __call__(self) -> List[Dict[str, Any]]:
+        return self.scrape()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r}, {self.config!r})"
+
+    def default_url(self) -> Optional[str]:
+        return None
+
+    def fetch(self):
+        logger.debug(f"Scraping {self.label}: {self.url}")
+        return fetch_body(self.url, self.headers)
+
+    def records(self, body) -> Iterator[Any]:
+        raise NotImplementedError
+
+    def extract(self, record: Any) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def scrape(self) -> List[Dict[str, Any]]:
+        with metrics.stage(self.name, "fetch"):
+            body = self.fetch()
+        jobs = self.collect(self.records(body))
+        logger.debug(f"[{self.label}] job listings found: {len(jobs)}")
+        return jobs
+
+    def collect(self, records: Iterable[Any]) -> List[Dict[str, Any]]:
+        """The shared filter/format/de-duplicate stage, run on raw records."""
+        jobs = JobCollector()
+        # Records are produced lazily, so reading the next one is timed as parsing
+        clock = metrics.StageClock(self.name)
+        for record in records:
+            job = self.extract(record)
+            clock.lap("parse")
+            job = self.accept(job)
+            if job is not None:
+                jobs.add(job)
+            clock.lap("filter")
+        clock.lap("parse")
+        clock.observe()
+        return jobs.jobs
+
+    def accept(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        The finished job dict, or None if the posting is filtered out. Rules may
+        refer to any extracted field; only the standard ones are kept.
+        """
+        for field in FIELDS:
+            if not job.get(field):
+                if field not in self.field_defaults:
+                    return None  # fields without a default are required
+                job[field] = self.field_defaults[field]
+
+        if not all(rule(job) for rule in self.require):
+            return None
+        if self.require_any and not any(rule(job) for rule in self.require_any):
+            return None
+        if any(rule(job) for rule in self.exclude):
+            return None
+        if EXCLUDED_TITLES.search(job["title"]):
+            return None
+
+        if self.base_url and not job["link"].startswith("http"):
+            job["link"] = f"{self.base_url}{job['link']}"
+        for field, formatter in self.formatters.items():
+            job[field] = formatter(job[field])
+
+        return {
+            "title": job["title"],
+            "link": job["link"],
+            "location": job["location"],
+            "category": job["category"],
+            "site": self.name,
+        }
+
+
+class JsonSource(Source):
+    """
+    Options: url, items (ijson prefix of the postings array, e.g. "jobs.item"),
+    nested (key of a list of postings inside each item; the item is then reachable
+    as parent.*), fields (field -> dotted path, or a list of paths to try in order).
+    """
+
+    adapter = "json"
+    defaults = {"items": "item"}
+
+    def records(self, body) -> Iterator[Any]:
+        nested = self.config.get("nested")
+        for item in iter_json_items(body, self.config["items"]):
+            if not nested:
+                yield item
+                continue
+            for child in item.get(nested) or []:
+                yield {**child, "parent": item}
+
+    def extract(self, record: Any) -> Dict[str, Any]:
+        job = {}
+        for field, paths in self.config.get("fields", {}).items():
+            for path in ([paths] if isinstance(paths, str) else paths):
+                value = _clean(get_path(record, path))
+                if value:
+                    job[field] = value
+                    break
+        return job
+
+
+class GreenhouseSource(JsonSource):
+    """
+    Greenhouse board API. Set `board` (and optionally `endpoint`: "jobs",
+    "departments" or "embed/departments") or a full `url`. Each job's metadata
+    list is exposed as meta.<name>, e.g. "meta.Cost Center".
+    """
+
+    adapter = "greenhouse"
+    defaults = {
+        "endpoint": "jobs",
+        "fields": {"title": "title", "link": "absolute_url", "location": "location.name"},
+    }
+
+    def __init__(self, name: str, options: Dict[str, Any]):
+        endpoint = options.get("endpoint", self.defaults["endpoint"])
+        by_department = endpoint.endswith("departments")
+        defaults = {
+            "items": "departments.item" if by_department else "jobs.item",
+            "nested": "jobs" if by_department else None,
+        }
+        super().__init__(name, {**defaults, **options})
+
+    def default_url(self) -> Optional[str]:
+        board = self.config.get("board")
+        return f"https://api.greenhouse.io/v1/boards/{board}/{self.config['endpoint']}" if board else None
+
+    def records(self, body) -> Iterator[Any]:
+        for record in super().records(body):
+            record["meta"] = {m.get("name"): m.get("value") for m in record.get("metadata") or []}
+            yield record
+
+
+class LeverSource(JsonSource):
+    """Lever postings API. Set `company` or a full `url`."""
+
+    adapter = "lever"
+    defaults = {
+        "items": "item",
+        "fields": {"title": "text", "link": "hostedUrl", "location": "categories.location", "category": "categories.team"},
+    }
+
+    def default_url(self) -> Optional[str]:
+        company = self.config.get("company")
+        return f"https://api.lever.co/v0/postings/{company}?mode=json" if company else None
+
+
+class HtmlSource(Source):
+    """
+    Server-rendered careers page. Options: url, items (CSS selector for one posting),
+    strain ({tag, class} of the element that holds the listings; only that subtree
+    is parsed), fields (field -> selector for its text, or {selector, attr}).
+    """
+
+    adapter = "html"
+
+    def __init__(self, name: str, options: Dict[str, Any]):
+        super().__init__(name, options)
+        if "items" not in self.config:
+            raise SourceConfigError(f"Source {name!r} needs an items selector")
+        strain = self.config.get("strain")
+        self.strainer = SoupStrainer(strain["tag"], class_=css_class(strain["class"])) if strain else None
+
+    def records(self, body) -> Iterator[Any]:
+        with body:
+            markup = body.read()
+        yield from self.parse(markup)
+
+    def parse(self, markup: Union[str, bytes], parser: Optional[str] = None, only=...) -> List[Any]:
+        """Posting elements of a page; `only` overrides the configured strainer."""
+        soup = parse_html(markup, only=self.strainer if only is ... else only, parser=parser)
+        return soup.select(self.config["items"])
+
+    def extract(self, element) -> Dict[str, Any]:
+        job = {}
+        for field, spec in self.config.get("fields", {}).items():
+            selector, attr = (spec, None) if isinstance(spec, str) else (spec["selector"], spec.get("attr"))
+            tag = element.select_one(selector)
+            if tag is None:
+                continue
+            value = tag.get(attr) if attr else tag.get_text(strip=True)
+            job[field] = _clean(value)
+        return job
+
+
+ADAPTERS = {cls.adapter: cls for cls in (JsonSource, GreenhouseSource, LeverSource, HtmlSource)}
+
+
+def make_source(name: str, options: Dict[str, Any]) -> Callable[[], List[Dict[str, Any]]]:
+    """Build the scraper for one registry entry."""
+    options = dict(options)
+    adapter = options.pop("adapter", None)
+    if adapter == "python":
+        return load_callable(options["function"])
+    if adapter not in ADAPTERS:
+        raise SourceConfigError(f"Source {name!r} has unknown adapter {adapter!r}; use one of {', '.join(ADAPTERS)} or python")
+    return ADAPTERS[adapter](name, options)
@@ -0,0 +1,51 @@
+from typing import Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from, never which job it is
+TRACKING_PARAMS = frozenset(["gh_src", "source", "src", "ref", "referrer", "lever-source", "fbclid", "gclid", "mc_cid", "mc_eid"])
+
+
+def normalize_link(link: str) -> str:
+    """
+    Canonical form of a job link for deduplication: case-folded host, http/https
+    treated alike, no trailing slash, no fragment and no tracking parameters.
+    """
+    parts = urlsplit(link.strip())
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    ))
+    return urlunsplit((scheme, parts.netloc.lower(), path, query, ""))
+
+
+class JobCollector:
+    """
+    Ordered, de-duplicated job list for one scrape. Duplicates are detected by
+    normalized link in constant time; the first posting seen wins and keeps its
+    original link, so stored links (and therefore seen state) are unchanged.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict] = {}
+
+    def add(self, job: Dict) -> bool:
+        """Add job unless its link was already collected. Returns True if added."""
+        key = normalize_link(job["link"])
+        if key in self._jobs:
+            return False
+        self._jobs[key] = job
+        return True
+
+    def __contains__(self, link: str) -> bool:
+        return normalize_link(link) in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    @property
+    def jobs(self) -> List[Dict]:
+        return list(self._jobs.values())
@@ -0,0 +1,60 @@
+"""
+HTML parser selection for the page scrapers.
+
+All scrapers work on a BeautifulSoup tree, but the tree builder underneath is
+pluggable: lxml is several times faster than the pure-Python html.parser on big
+careers pages and is used when installed. Pass a SoupStrainer as `only` to build
+just the job listing subtree instead of the whole document.
+"""
+import re
+from typing import Optional, Pattern, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+from backend.config import HTML_PARSER
+
+# Preferred tree builders, fastest first; html.parser ships with Python
+PARSER_PREFERENCE = ("lxml", "html.parser")
+
+
+def available_parsers():
+    return [name for name in PARSER_PREFERENCE if builder_registry.lookup(name)]
+
+
+def resolve_parser(name: str = HTML_PARSER) -> str:
+    """The builder to use for `name`, where "auto" means the fastest one installed."""
+    if name == "auto":
+        return available_parsers()[0]
+    if not builder_registry.lookup(name):
+        raise ValueError(f"HTML parser {name!r} is not installed; available: {', '.join(available_parsers())}")
+    return name
+
+
+def css_class(name: str) -> Pattern:
+    """
+    Match elements carrying CSS class `name` in a SoupStrainer. While parsing, the
+    strainer sees the raw class attribute ("MuiStack-root css-1"), so a plain
+    class_="MuiStack-root" would miss elements that have more than one class.
+    """
+    return re.compile(rf"(?:^|\s){re.escape(name)}(?:\s|$)")
+
+
+def parse_html(
+    markup: Union[str, bytes],
+    only: Optional[SoupStrainer] = None,
+    parser: Optional[str] = None,
+    encoding: Optional[str] = None,
+) -> BeautifulSoup:
+    """
+    Parse markup with the configured backend. Bytes are decoded by the parser
+    (using `encoding` if given), which avoids requests guessing the charset of
+    the whole page first.
+    """
+    return BeautifulSoup(
+        markup,
+        resolve_parser(parser or HTML_PARSER),
+        parse_only=only,
+        from_encoding=encoding if isinstance(markup, bytes) else None,
+    )
+
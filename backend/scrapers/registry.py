@@ -0,0 +1,46 @@
+"""
+Source registry: which career sites are scraped and how.
+
+Sources come from the TOML registry (SOURCES_FILE, by default sources.toml next to
+this module) followed by any installed plugins registered under the
+"job_scraper.sources" entry point group, each resolving to a scraper callable.
+"""
+import tomllib
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from backend.config import SOURCES_FILE
+from backend.logger import logger
+from backend.scrapers.adapters import make_source
+
+ENTRY_POINT_GROUP = "job_scraper.sources"
+
+Scraper = Callable[[], List[Dict]]
+
+
+def load_registry(path: Path = SOURCES_FILE) -> Dict[str, Scraper]:
+    with open(path, "rb") as f:
+        entries = tomllib.load(f).get("sources", {})
+    return {name: make_source(name, options) for name, options in entries.items()}
+
+
+def load_plugins() -> Dict[str, Scraper]:
+    plugins = {}
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            plugins[ep.name] = ep.load()
+        except Exception as e:
+            logger.error(f"[Sources] Failed to load plugin source {ep.name}: {e}")
+    return plugins
+
+
+def load_sources(path: Path = SOURCES_FILE) -> Dict[str, Scraper]:
+    sources = load_registry(path)
+    for name, scraper in load_plugins().items():
+        if name in sources:
+            logger.warning(f"[Sources] Plugin source {name} ignored; the registry already defines it")
+            continue
+        sources[name] = scraper
+    logger.debug(f"[Sources] Loaded {len(sources)} sources: {', '.join(sources)}")
+    return sources
@@ -0,0 +1,147 @@
+"""
+In-memory job index behind the filtered, paginated form of GET /jobs.
+
+An index is built once per published views version from the jobs view. It keeps
+inverted indexes from site, category, location tokens and title/category tokens to
+job ids, plus every supported sort order precomputed, so a query is a few set
+intersections and a walk down one sorted list.
+"""
+import base64
+import json
+import re
+from typing import Dict, List, Optional, Set
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+SORT_FIELDS = ("site", "title", "location", "category")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidQuery(ValueError):
+    """A query the index can't answer, e.g. a bad sort field or an expired cursor."""
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def encode_cursor(version: int, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode("ascii")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        version, offset = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii").split(":")
+        version, offset = int(version), int(offset)
+    except Exception:
+        raise InvalidQuery("Malformed cursor")
+    if offset < 0:
+        raise InvalidQuery("Malformed cursor")
+    return version, offset
+
+
+class JobIndex:
+    def __init__(self, seen: Dict[str, List[Dict]], version: int):
+        self.version = version
+        self.jobs: List[Dict] = []
+        self.by_site: Dict[str, Set[int]] = {}
+        self.by_category: Dict[str, Set[int]] = {}
+        self.by_location: Dict[str, Set[int]] = {}
+        self.by_token: Dict[str, Set[int]] = {}
+        self._titles: List[str] = []
+
+        for site, jobs in seen.items():
+            for job in jobs:
+                job_id = len(self.jobs)
+                self.jobs.append({**job, "site": job.get("site") or site})
+                title = job.get("title") or ""
+                category = job.get("category") or ""
+                self._titles.append(title.lower())
+                self.by_site.setdefault(site.lower(), set()).add(job_id)
+                self.by_category.setdefault(category.lower(), set()).add(job_id)
+                for token in tokenize(job.get("location") or ""):
+                    self.by_location.setdefault(token, set()).add(job_id)
+                for token in tokenize(f"{title} {category}"):
+                    self.by_token.setdefault(token, set()).add(job_id)
+
+        # Ids are already in site order; the other orders are computed once here
+        self.orders: Dict[str, List[int]] = {"site": list(range(len(self.jobs)))}
+        for field in SORT_FIELDS[1:]:
+            self.orders[field] = sorted(
+                range(len(self.jobs)),
+                key=lambda i: ((self.jobs[i].get(field) or "").lower(), i),
+            )
+
+    def _all_tokens(self, index: Dict[str, Set[int]], text: str) -> Set[int]:
+        """Ids whose indexed text contains every token of `text`."""
+        result: Optional[Set[int]] = None
+        for token in tokenize(text):
+            ids = index.get(token, set())
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return result if result is not None else set(range(len(self.jobs)))
+
+    def search(
+        self,
+        site: Optional[str] = None,
+        category: Optional[str] = None,
+        location: Optional[str] = None,
+        title: Optional[str] = None,
+        keyword: Optional[str] = None,
+        sort: str = "site",
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Dict:
+        descending = sort.startswith("-")
+        field = sort.lstrip("-")
+        if field not in self.orders:
+            raise InvalidQuery(f"Unknown sort field {field!r}; use one of {', '.join(SORT_FIELDS)}")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        offset = 0
+        if cursor:
+            version, offset = decode_cursor(cursor)
+            if version != self.version:
+                raise InvalidQuery("Cursor belongs to an older job list; start again without it")
+
+        candidates: Optional[Set[int]] = None
+
+        def narrow(ids: Set[int]):
+            nonlocal candidates
+            candidates = ids if candidates is None else candidates & ids
+
+        if site:
+            narrow(set().union(*(self.by_site.get(s.strip().lower(), set()) for s in site.split(","))))
+        if category:
+            narrow(self.by_category.get(category.strip().lower(), set()))
+        if location:
+            narrow(self._all_tokens(self.by_location, location))
+        if keyword:
+            narrow(self._all_tokens(self.by_token, keyword))
+        if title:
+            # Substrings can't be served from the token index; filter what's left
+            needle = title.lower()
+            pool = candidates if candidates is not None else range(len(self.jobs))
+            candidates = {i for i in pool if needle in self._titles[i]}
+
+        order = self.orders[field]
+        if descending:
+            order = order[::-1]
+        if candidates is not None:
+            order = [i for i in order if i in candidates]
+        if offset > len(order):
+            # Only a cursor from a different query can point past the end
+            raise InvalidQuery("Cursor is past the end of the results; start again without it")
+
+        page = order[offset:offset + limit]
+        next_offset = offset + limit
+        return {
+            "count": len(order),
+            "jobs": [self.jobs[i] for i in page],
+            "next_cursor": encode_cursor(self.version, next_offset) if next_offset < len(order) else None,
+        }
+
+
+def build_index(jobs_body: bytes, version: int) -> JobIndex:
+    return JobIndex(json.loads(jobs_body), version)
@@ -0,0 +1,277 @@
+"""
+Seen-job state backends.
+
+`json` keeps the original jobs-seen.json document and rewrites it on every commit.
+`sqlite` keeps one row per (site, link) and only touches the rows a check changed.
+Both expose the same interface, so the rest of the app never cares which is active.
+"""
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from backend.alert import SiteDiff
+from backend.config import DATA_FILE, STATE_BACKEND, STATE_DB_FILE
+from backend.logger import logger
+from backend.utils import load_state, save_state
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class StateStore:
+    """Interface shared by every state backend."""
+
+    def exists(self) -> bool:
+        raise NotImplementedError
+
+    def load(self) -> Dict[str, List[Dict]]:
+        """Every site's seen jobs, in the jobs-seen.json shape."""
+        raise NotImplementedError
+
+    def load_fingerprints(self) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def version(self) -> Optional[str]:
+        """Identifies the committed state: changes with every commit, by any process. None if there is none."""
+        raise NotImplementedError
+
+    def commit(self, diffs: Iterable[SiteDiff], fingerprints: Dict[str, Optional[str]]) -> None:
+        """
+        Persist one check in a single step: the diffs of every re-parsed site plus
+        the fingerprint (None if the scraper fetched nothing) of every site that
+        was checked successfully this run.
+        """
+        raise NotImplementedError
+
+    def export_json(self, path: Path = DATA_FILE) -> None:
+        """
+        Write the state as a jobs-seen.json document. Fingerprints are left out, so
+        the first check after loading it re-parses every site.
+        """
+        save_state(self.load(), {}, path)
+        logger.info(f"[State] Exported seen state to {path}")
+
+
+class JsonStateStore(StateStore):
+    """The original single-document store in DATA_FILE."""
+
+    def exists(self) -> bool:
+        return DATA_FILE.exists()
+
+    def load(self) -> Dict[str, List[Dict]]:
+        return load_state()[0]
+
+    def load_fingerprints(self) -> Dict[str, str]:
+        return load_state()[1]
+
+    def version(self) -> Optional[str]:
+        try:
+            stat = DATA_FILE.stat()
+        except FileNotFoundError:
+            return None
+        # Every commit replaces the file, so the inode and mtime change together
+        return f"{stat.st_ino}-{stat.st_mtime_ns}"
+
+    def commit(self, diffs: Iterable[SiteDiff], fingerprints: Dict[str, Optional[str]]) -> None:
+        seen, previous = load_state()
+        for diff in diffs:
+            seen[diff.site] = diff.current
+        # One write, so the fingerprints can never get ahead of the jobs they describe
+        merged = {**previous, **fingerprints}
+        save_state(seen, {site: fp for site, fp in merged.items() if fp and site in seen})
+
+
+class SqliteStateStore(StateStore):
+    """
+    Indexed store in STATE_DB_FILE. Jobs are keyed by (site, link) and a commit only
+    inserts, updates or deletes the rows in the diff. A job's last_seen is its site's
+    last_checked, since stale jobs are deleted the moment a check stops seeing them.
+    The database runs in WAL mode, so API readers keep reading the last committed
+    snapshot while a check is writing, without taking any lock.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            site        TEXT NOT NULL,
+            link        TEXT NOT NULL,
+            data        TEXT NOT NULL,
+            first_seen  TEXT NOT NULL,
+            updated_at  TEXT NOT NULL,
+            position    INTEGER               -- index in the site's scraped order
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS jobs_site_link ON jobs (site, link);
+        CREATE TABLE IF NOT EXISTS sites (
+            site          TEXT PRIMARY KEY,
+            fingerprint   TEXT,
+            last_checked  TEXT
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key    TEXT PRIMARY KEY,
+            value  TEXT NOT NULL
+        )
+    """
+    # Run inside every write transaction
+    BUMP_VERSION = (
+        "INSERT INTO meta (key, value) VALUES ('version', '1') "
+        "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+    )
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._initialised = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialised:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialised:
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                # Schema, migrations and the JSON import commit together or not at all,
+                # and the next connection retries them if anything here fails
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    for statement in self.SCHEMA.split(";"):
+                        conn.execute(statement)
+                    self._migrate(conn)
+                    self._import_json(conn)
+            except BaseException:
+                conn.close()
+                raise
+            self._initialised = True
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Bring a database created by an older version up to SCHEMA."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "position" not in columns:
+            # Jobs were loaded in insertion order until now; keep that order
+            conn.execute("ALTER TABLE jobs ADD COLUMN position INTEGER")
+            conn.execute("UPDATE jobs SET position = rowid")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_site_position ON jobs (site, position)")
+
+    def _import_json(self, conn: sqlite3.Connection) -> None:
+        """
+        One-time migration from an existing jobs-seen.json into an empty database, run
+        inside _connect's transaction. A meta row records that it ran, so a database
+        whose sites all later have no jobs never re-imports jobs removed since.
+        """
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+            return
+        now = _now()
+        conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', ?)", (now,))
+        if conn.execute("SELECT 1 FROM jobs LIMIT 1").fetchone() or not DATA_FILE.exists():
+            return
+        seen, fingerprints = load_state()
+        conn.executemany(
+            "INSERT OR IGNORE INTO jobs (site, link, data, first_seen, updated_at, position) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (site, job["link"], json.dumps(job, ensure_ascii=False), now, now, position)
+                for site, jobs in seen.items() for position, job in enumerate(jobs) if job.get("link")
+            ),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO sites (site, fingerprint, last_checked) VALUES (?, ?, NULL)",
+            ((site, fingerprints.get(site)) for site in seen),
+        )
+        conn.execute(self.BUMP_VERSION)
+        logger.info(f"[State] Imported {sum(len(v) for v in seen.values())} jobs from {DATA_FILE}")
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> Dict[str, List[Dict]]:
+        seen: Dict[str, List[Dict]] = {}
+        conn = self._connect()
+        try:
+            # Seed from sites so a site with no current jobs still shows up as []
+            for (site,) in conn.execute("SELECT site FROM sites ORDER BY rowid"):
+                seen[site] = []
+            for site, data in conn.execute("SELECT site, data FROM jobs ORDER BY site, position"):
+                seen.setdefault(site, []).append(json.loads(data))
+        finally:
+            conn.close()
+        return seen
+
+    def load_fingerprints(self) -> Dict[str, str]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT site, fingerprint FROM sites WHERE fingerprint IS NOT NULL")
+            return dict(rows.fetchall())
+        finally:
+            conn.close()
+
+    def version(self) -> Optional[str]:
+        if not self.path.exists():
+            return None
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else "0"
+
+    def commit(self, diffs: Iterable[SiteDiff], fingerprints: Dict[str, Optional[str]]) -> None:
+        now = _now()
+        conn = self._connect()
+        try:
+            with conn:
+                for diff in diffs:
+                    conn.executemany(
+                        "INSERT INTO jobs (site, link, data, first_seen, updated_at) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (site, link) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                        ((diff.site, j["link"], json.dumps(j, ensure_ascii=False), now, now) for j in diff.added),
+                    )
+                    conn.executemany(
+                        "UPDATE jobs SET data = ?, updated_at = ? WHERE site = ? AND link = ?",
+                        ((json.dumps(j, ensure_ascii=False), now, diff.site, j["link"]) for j in diff.updated),
+                    )
+                    conn.executemany(
+                        "DELETE FROM jobs WHERE site = ? AND link = ?",
+                        ((diff.site, j["link"]) for j in diff.removed),
+                    )
+                    # Keep the scraped order so a reload (or a rebuilt cache) lists jobs
+                    # exactly as this check did; rows already in place aren't rewritten
+                    conn.executemany(
+                        "UPDATE jobs SET position = ? WHERE site = ? AND link = ? AND position IS NOT ?",
+                        ((position, diff.site, j["link"], position) for position, j in enumerate(diff.current)),
+                    )
+                conn.executemany(
+                    "INSERT INTO sites (site, fingerprint, last_checked) VALUES (?, ?, ?) "
+                    "ON CONFLICT (site) DO UPDATE SET fingerprint = excluded.fingerprint, last_checked = excluded.last_checked",
+                    ((site, fingerprint, now) for site, fingerprint in fingerprints.items()),
+                )
+                conn.execute(self.BUMP_VERSION)
+        finally:
+            conn.close()
+        logger.debug(f"[State] Committed seen state to {self.path}")
+
+    def job_history(self, site: str) -> List[Dict]:
+        """Jobs for a site with their first_seen/last_seen timestamps."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT j.data, j.first_seen, s.last_checked FROM jobs j "
+                "LEFT JOIN sites s ON s.site = j.site WHERE j.site = ? ORDER BY j.position",
+                (site,),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            {**json.loads(data), "first_seen": first_seen, "last_seen": last_checked or first_seen}
+            for data, first_seen, last_checked in rows
+        ]
+
+
+def make_state_store(backend: str = STATE_BACKEND) -> StateStore:
+    if backend == "sqlite":
+        return SqliteStateStore(STATE_DB_FILE)
+    if backend != "json":
+        logger.warning(f"[State] Unknown STATE_BACKEND {backend!r}; using json")
+    return JsonStateStore()
+
+
+state_store = make_state_store()
@@ -0,0 +1,12 @@
+import pytest
+
+from backend import state, utils
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    """Point jobs-seen.json at a temporary file for the test."""
+    path = tmp_path / "jobs-seen.json"
+    monkeypatch.setattr(utils, "DATA_FILE", path)
+    monkeypatch.setattr(state, "DATA_FILE", path)
+    return path
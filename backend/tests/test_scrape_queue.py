@@ -0,0 +1,73 @@
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from backend import scrape_queue
+from backend.scrape_queue import CLAIMED_KEY, ScrapeQueue, ScrapeWorker, Task, scrape_distributed
+
+LEASE = 0.2
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_queue(server):
+    return ScrapeQueue(fakeredis.FakeRedis(server=server, decode_responses=True), lease=LEASE)
+
+
+def test_claimed_site_is_not_handed_out_twice(server):
+    queue = make_queue(server)
+    queue.start_run([Task("run", "stripe", None), Task("run", "stripe", None, attempt=2)])
+
+    assert Task.decode(queue.claim()).site == "stripe"
+    assert queue.claim() is None
+
+
+def test_lapsed_lease_is_reaped_and_its_result_dropped(server):
+    queue = make_queue(server)
+    queue.start_run([Task("run", "stripe", "fp")])
+    raw = queue.claim()
+    task = Task.decode(raw)
+
+    assert queue.reap() == []
+    assert queue.renew(raw, task)
+    time.sleep(LEASE * 1.5)
+
+    assert queue.reap() == [task]
+    assert not queue.r.hexists(CLAIMED_KEY, "stripe")
+    # The worker that held it can neither renew it nor deliver a result any more
+    assert not queue.renew(raw, task)
+    assert not queue.complete(raw, task, {"site": "stripe", "jobs": []})
+    assert queue.next_result("run", timeout=0.01) is None
+
+
+def test_lapsed_task_is_requeued_for_a_live_worker(server, monkeypatch):
+    monkeypatch.setattr(scrape_queue, "POLL_SECONDS", 0.05)
+    jobs = [{"title": "Engineer", "link": "https://x/1"}]
+    scrapers = {"stripe": lambda: jobs}
+
+    coordinator = make_queue(server)
+    start_run = coordinator.start_run
+    worker = ScrapeWorker(make_queue(server), scrapers, concurrency=1, worker_id="w1")
+    thread = threading.Thread(target=worker.run)
+
+    def start_run_and_die(tasks):
+        # Another worker claims the site and dies before finishing it
+        start_run(tasks)
+        assert make_queue(server).claim() is not None
+        thread.start()
+
+    monkeypatch.setattr(coordinator, "start_run", start_run_and_die)
+    coordinator.register("w1")
+    try:
+        results = scrape_distributed(coordinator, scrapers)
+    finally:
+        worker.stop()
+        thread.join(5)
+
+    assert results["stripe"].error is None
+    assert results["stripe"].jobs == jobs
@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import api
+from backend.search import InvalidQuery, JobIndex, encode_cursor
+
+VERSION = 7
+
+
+@pytest.fixture
+def index():
+    return JobIndex({"stripe": [{"title": f"Engineer {i}", "link": f"https://x/{i}"} for i in range(5)]}, VERSION)
+
+
+def test_cursor_pages_through_results(index):
+    first = index.search(limit=3)
+    second = index.search(cursor=first["next_cursor"], limit=3)
+    assert [job["link"] for job in first["jobs"] + second["jobs"]] == [f"https://x/{i}" for i in range(5)]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    encode_cursor(VERSION, -1),
+    encode_cursor(VERSION, 6),
+    encode_cursor(VERSION - 1, 0),
+])
+def test_invalid_cursor(index, cursor):
+    with pytest.raises(InvalidQuery):
+        index.search(cursor=cursor)
+
+
+def test_invalid_cursor_is_a_bad_request(index, monkeypatch):
+    async def job_index():
+        return index
+
+    monkeypatch.setattr(api, "job_index", job_index)
+    response = TestClient(api.app).get("/jobs", params={"cursor": encode_cursor(VERSION, -3)})
+    assert response.status_code == 400
@@ -0,0 +1,78 @@
+import json
+import sqlite3
+
+import pytest
+
+from backend import state, utils
+from backend.alert import diff_jobs_for_site
+from backend.state import JsonStateStore, SqliteStateStore
+
+
+def jobs(*links):
+    return [{"title": f"Job {link}", "link": link} for link in links]
+
+
+def test_load_state_reads_legacy_flat_document(data_file):
+    data_file.write_text(json.dumps({"stripe": jobs("a", "b")}))
+    assert utils.load_state() == ({"stripe": jobs("a", "b")}, {})
+
+
+def test_save_state_nests_sites_and_fingerprints(data_file):
+    utils.save_state({"stripe": jobs("a")}, {"stripe": "fp"})
+    assert json.loads(data_file.read_text()) == {"sites": {"stripe": jobs("a")}, "fingerprints": {"stripe": "fp"}}
+    assert JsonStateStore().load_fingerprints() == {"stripe": "fp"}
+
+
+def test_sqlite_imports_json_once_in_order(data_file, tmp_path):
+    utils.save_state({"stripe": jobs("c", "a", "b"), "plaid": jobs("z")}, {"stripe": "fp"})
+    store = SqliteStateStore(tmp_path / "state.db")
+
+    assert store.load() == {"stripe": jobs("c", "a", "b"), "plaid": jobs("z")}
+    assert store.load_fingerprints() == {"stripe": "fp"}
+
+    # Every job goes stale; a new process must not import them again
+    seen = store.load()
+    store.commit([diff_jobs_for_site(site, [], current) for site, current in seen.items()], {})
+    assert SqliteStateStore(tmp_path / "state.db").load() == {"stripe": [], "plaid": []}
+
+
+def test_sqlite_failed_import_is_retried(data_file, tmp_path, monkeypatch):
+    utils.save_state({"stripe": jobs("a")}, {})
+
+    def fail():
+        raise OSError("disk went away")
+
+    store = SqliteStateStore(tmp_path / "state.db")
+    with monkeypatch.context() as patch:
+        patch.setattr(state, "load_state", fail)
+        with pytest.raises(OSError):
+            store.load()
+    assert store.load() == {"stripe": jobs("a")}
+
+
+def test_sqlite_load_keeps_scrape_order_across_restarts(data_file, tmp_path):
+    store = SqliteStateStore(tmp_path / "state.db")
+    for scraped in (jobs("a", "b", "c"), jobs("b", "c"), jobs("a", "c", "b")):
+        store.commit([diff_jobs_for_site("stripe", scraped, store.load().get("stripe", []))], {"stripe": None})
+        assert SqliteStateStore(tmp_path / "state.db").load() == {"stripe": scraped}
+
+
+def test_sqlite_migrates_databases_without_positions(data_file, tmp_path):
+    path = tmp_path / "state.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE jobs (site TEXT NOT NULL, link TEXT NOT NULL, data TEXT NOT NULL,
+                           first_seen TEXT NOT NULL, updated_at TEXT NOT NULL);
+        CREATE UNIQUE INDEX jobs_site_link ON jobs (site, link);
+        CREATE TABLE sites (site TEXT PRIMARY KEY, fingerprint TEXT, last_checked TEXT);
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        INSERT INTO meta VALUES ('json_imported', 'then');
+    """)
+    conn.executemany(
+        "INSERT INTO jobs VALUES ('stripe', ?, ?, 'then', 'then')",
+        ((job["link"], json.dumps(job)) for job in jobs("b", "a")),
+    )
+    conn.commit()
+    conn.close()
+
+    assert SqliteStateStore(path).load() == {"stripe": jobs("b", "a")}
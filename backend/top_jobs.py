@@ -0,0 +1,109 @@
+"""
+Top-jobs ranking, kept up to date from each check's diffs.
+
+The index holds one scored entry per matching (site, link). A check only rescores the
+jobs its SiteDiffs added or updated and drops the removed ones, so the cost of a
+check scales with churn rather than with the number of jobs seen. The ranked list is
+ready as soon as the diffs are applied.
+
+A job's score is the summed weight of the TOP_JOBS_KEYWORDS in its title, plus
+TOP_JOBS_DESCRIPTION_WEIGHT times the weight of keywords found only in its
+description. Jobs rank by score, then company and title.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from backend.alert import SiteDiff
+from backend.config import TOP_JOBS_KEYWORDS, TOP_JOBS_DESCRIPTION_WEIGHT
+from backend.filters import KeywordMatcher
+from backend.logger import logger
+
+
+class TopJobsIndex:
+    def __init__(self, weights: Dict[str, float] = TOP_JOBS_KEYWORDS, description_weight: float = TOP_JOBS_DESCRIPTION_WEIGHT):
+        self.weights = dict(weights)
+        self.description_weight = description_weight
+        self.matcher = KeywordMatcher(self.weights)
+        self._entries: Dict[Tuple[str, str], Dict] = {}
+        self._state_version: Optional[str] = None  # the committed state the index reflects, if any
+        self._ranked: Optional[List[Dict]] = None
+        self._lock = threading.Lock()
+
+    def score(self, site: str, job: Dict) -> Optional[Dict]:
+        """The top-jobs entry for a job, or None if it matches no keyword."""
+        in_title = set(self.matcher.findall(job.get("title", "")))
+        in_description = set(self.matcher.findall(job.get("description", ""))) - in_title
+        if not in_title and not in_description:
+            return None
+        score = sum(self.weights[k] for k in in_title)
+        score += self.description_weight * sum(self.weights[k] for k in in_description)
+        return {
+            "company": site.capitalize(),
+            "title": job.get("title"),
+            "location": job.get("location"),
+            "link": job.get("link"),
+            "logo": job.get("logo") or f"/logos/{site.lower().replace(' ', '-')}.svg",
+            "filters": [k for k in self.matcher.terms if k in in_title or k in in_description],
+            "score": round(score, 2),
+        }
+
+    def _put(self, site: str, job: Dict) -> None:
+        key = (site, job.get("link"))
+        entry = self.score(site, job)
+        if entry:
+            self._entries[key] = entry
+        else:
+            self._entries.pop(key, None)
+
+    def rebuild(self, seen: Dict[str, List[Dict]], state_version: Optional[str] = None) -> None:
+        """Score every job in the seen state (of `state_version`, if known) from scratch."""
+        with self._lock:
+            self._entries.clear()
+            for site, jobs in seen.items():
+                for job in jobs:
+                    self._put(site, job)
+            self._state_version = state_version
+            self._ranked = None
+        logger.debug(f"[TopJobs] Rebuilt index: {len(self._entries)} matching jobs")
+
+    def sync(self, seen: Dict[str, List[Dict]], state_version: Optional[str]) -> None:
+        """
+        Rebuild from `seen` unless the index already reflects that state version. The
+        version changes with every commit, so state written by another process (or
+        not written at all after this process applied diffs) forces a rebuild.
+        """
+        if state_version is None or state_version != self._state_version:
+            self.rebuild(seen, state_version)
+
+    def committed(self, state_version: Optional[str]) -> None:
+        """The diffs applied since the last sync were committed as `state_version`."""
+        with self._lock:
+            self._state_version = state_version
+
+    def apply(self, diff: SiteDiff) -> None:
+        """Rescore the jobs one site's check added or updated and drop the removed ones."""
+        with self._lock:
+            for job in diff.removed:
+                self._entries.pop((diff.site, job.get("link")), None)
+            for job in diff.added + diff.updated:
+                self._put(diff.site, job)
+            self._state_version = None  # ahead of the committed state until committed()
+            self._ranked = None
+
+    def ranked(self) -> List[Dict]:
+        with self._lock:
+            if self._ranked is None:
+                self._ranked = sorted(
+                    self._entries.values(),
+                    key=lambda e: (-e["score"], e["company"].lower(), (e["title"] or "").lower()),
+                )
+            return self._ranked
+
+    def view(self) -> Dict:
+        jobs = self.ranked()
+        return {
+            "count": len(jobs),
+            "jobs": jobs,
+            "keywords": list(self.weights),
+            "weights": self.weights,
+        }
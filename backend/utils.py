@@ -1,32 +1,346 @@
+import os
 import json
+import shutil
+import hashlib
+import tempfile
+import threading
 import requests
-from typing import Dict, List
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from requests.structures import CaseInsensitiveDict
 
-from backend.config import DATA_FILE, USER_AGENT
+try:
+    import ijson
+except ImportError:  # fall back to json.load; same results, without the memory savings
+    ijson = None
+
+from backend.config import DATA_FILE, HTTP_CACHE_DIR
+from backend.http_client import client
 from backend.logger import logger
+from backend import metrics
+
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_SPOOL_SIZE = 1024 * 1024  # streamed bodies larger than this spill to a temp file
+
+
+class FetchError(Exception):
+    """A request made on behalf of a scraper failed."""
+
+
+def atomic_write_bytes(path: Path, data: Union[bytes, BinaryIO]) -> None:
+    """
+    Replace path with data (bytes or a readable binary file) via temp file + fsync +
+    rename, so a reader (or a crash) only ever sees the old file or the complete new
+    one, never a truncated one.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if isinstance(data, (bytes, bytearray)):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f, STREAM_CHUNK_SIZE)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+    # Persist the rename itself; not every platform lets you fsync a directory
+    with suppress(OSError):
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+class HttpCache:
+    """
+    Persistent per-URL cache of ETag/Last-Modified validators and the body they describe.
+    Each URL is stored as <sha256>.json (validators/headers) plus <sha256>.body (raw bytes).
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def _load(self, url: str) -> Optional[Dict]:
+        meta_path, body_path = self._paths(url)
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except Exception as ex:
+            logger.warning(f"[Cache] Ignoring unreadable HTTP cache entry for {url}: {ex}")
+            return None
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for url, empty if nothing is cached."""
+        meta = self._load(url)
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store(self, url: str, response: requests.Response, body: Optional[BinaryIO] = None) -> None:
+        """
+        Remember a 200 response if the server gave us something to revalidate with.
+        Pass `body` for streamed responses; it is copied from its current position.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        meta = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": response.headers.get("Content-Type"),
+            "encoding": response.encoding,
+        }
+        meta_path, body_path = self._paths(url)
+        try:
+            # Drop the old validators first so a crash can't pair them with the new body
+            meta_path.unlink(missing_ok=True)
+            atomic_write_bytes(body_path, response.content if body is None else body)
+            atomic_write_text(meta_path, json.dumps(meta))
+        except Exception as ex:
+            logger.warning(f"[Cache] Failed to store HTTP cache entry for {url}: {ex}")
+
+    def open_body(self, url: str) -> Optional[BinaryIO]:
+        """The cached body as an open file, or None if nothing is cached."""
+        if self._load(url) is None:
+            return None
+        _, body_path = self._paths(url)
+        try:
+            return body_path.open("rb")
+        except FileNotFoundError:
+            return None
+
+    def replay(self, url: str, response: requests.Response) -> Optional[requests.Response]:
+        """Turn a 304 into the cached 200 response, or None if the entry vanished."""
+        meta = self._load(url)
+        if not meta:
+            return None
+        _, body_path = self._paths(url)
+        cached = requests.Response()
+        cached.status_code = 200
+        cached._content = body_path.read_bytes()
+        cached.headers = CaseInsensitiveDict(response.headers)
+        if meta.get("content_type"):
+            cached.headers["Content-Type"] = meta["content_type"]
+        cached.encoding = meta.get("encoding")
+        cached.url = response.url
+        cached.request = response.request
+        cached.reason = "OK (revalidated)"
+        return cached
+
+    def record(self, hit: bool) -> None:
+        metrics.http_cache.labels(metrics.current_site(), "hit" if hit else "miss").inc()
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+http_cache = HttpCache(HTTP_CACHE_DIR)
+
+
+class SiteUnchanged(Exception):
+    """Raised out of safe_get when a site's payload matches the fingerprint of the last check."""
+
+    def __init__(self, fingerprint: str):
+        super().__init__(fingerprint)
+        self.fingerprint = fingerprint
+
+
+_fingerprint_local = threading.local()
 
-session = requests.Session()
-session.headers.update({"User-Agent": USER_AGENT})
 
-def safe_get(url: str, **kwargs):
+@contextmanager
+def fingerprint_guard(previous: Optional[str], salt: bytes = b""):
+    """
+    Fingerprint the first response fetched by this thread inside the block.
+    If it hashes to `previous`, safe_get raises SiteUnchanged so the scraper
+    stops before parsing anything. The digest is exposed as guard["fingerprint"].
+    `salt` is hashed in front of the body so the fingerprint also changes when
+    whatever turns the body into jobs (scraper code, filter rules) changes.
+    A scraper that fetches more than one response (pages, detail pages) gets no
+    fingerprint, since its first response can't vouch for the others, so it is
+    never skipped.
+    """
+    guard = {"previous": previous, "fingerprint": None, "salt": salt, "responses": 0}
+    _fingerprint_local.guard = guard
     try:
-        r = session.get(url, timeout=15, **kwargs)
+        yield guard
+    finally:
+        _fingerprint_local.guard = None
+
+
+def _check_fingerprint(chunks: Iterable[bytes]) -> None:
+    guard = getattr(_fingerprint_local, "guard", None)
+    if guard is None:
+        return
+    guard["responses"] += 1
+    if guard["responses"] > 1:
+        guard["fingerprint"] = None
+        return
+    digest = hashlib.sha256(guard["salt"])
+    for chunk in chunks:
+        digest.update(chunk)
+    guard["fingerprint"] = digest.hexdigest()
+    if guard["fingerprint"] == guard["previous"]:
+        raise SiteUnchanged(guard["fingerprint"])
+
+
+def _get(url: str, use_cache: bool, headers: Optional[Dict[str, str]], **kwargs):
+    try:
+        request_headers = dict(headers or {})
+        if use_cache:
+            request_headers.update(http_cache.validators(url))
+
+        r = client.get(url, headers=request_headers, **kwargs)
         r.raise_for_status()
+
+        if use_cache and r.status_code == 304:
+            cached = http_cache.replay(url, r)
+            if cached is not None:
+                http_cache.record(hit=True)
+                logger.debug(f"[Cache] {url} not modified; reusing stored body")
+                return cached
+            # Entry disappeared between sending validators and now; fetch it again
+            return _get(url, False, headers, **kwargs)
+
+        metrics.response_bytes.labels(metrics.current_site()).observe(len(r.content))
+        if use_cache:
+            http_cache.record(hit=False)
+            http_cache.store(url, r)
         return r
     except Exception as e:
         logger.error(f"[Scrape] Request failed for {url}: {e}")
         return None
 
-def load_seen() -> Dict[str, List[Dict]]:
+
+def safe_get(url: str, use_cache: bool = True, headers: Optional[Dict[str, str]] = None, **kwargs):
+    r = _get(url, use_cache, headers, **kwargs)
+    if r is not None:
+        _check_fingerprint([r.content])
+    return r
+
+
+def _download(url: str, use_cache: bool, headers: Optional[Dict[str, str]]) -> BinaryIO:
+    request_headers = dict(headers or {})
+    if use_cache:
+        request_headers.update(http_cache.validators(url))
+
+    with client.get(url, headers=request_headers, stream=True) as r:
+        r.raise_for_status()
+
+        if use_cache and r.status_code == 304:
+            cached = http_cache.open_body(url)
+            if cached is not None:
+                http_cache.record(hit=True)
+                logger.debug(f"[Cache] {url} not modified; streaming stored body")
+                return cached
+            return _download(url, False, headers)
+
+        body = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_SIZE)
+        for chunk in r.iter_content(STREAM_CHUNK_SIZE):
+            body.write(chunk)
+        metrics.response_bytes.labels(metrics.current_site()).observe(body.tell())
+        body.seek(0)
+        if use_cache:
+            http_cache.record(hit=False)
+            http_cache.store(url, r, body)
+            body.seek(0)
+        return body
+
+
+def fetch_body(url: str, headers: Optional[Dict[str, str]] = None, use_cache: bool = True) -> BinaryIO:
+    """
+    Download url into a spooled temporary file instead of memory and return it
+    positioned at the start. Honors the HTTP cache and the site fingerprint like
+    safe_get, but raises FetchError on failure instead of returning None.
+    """
+    try:
+        body = _download(url, use_cache, headers)
+    except Exception as e:
+        logger.error(f"[Scrape] Request failed for {url}: {e}")
+        raise FetchError(f"Request failed for {url}: {e}") from e
+
+    try:
+        _check_fingerprint(iter(lambda: body.read(STREAM_CHUNK_SIZE), b""))
+        body.seek(0)
+    except BaseException:
+        body.close()
+        raise
+    return body
+
+
+def iter_json_items(body: BinaryIO, prefix: str) -> Iterator[Any]:
+    """
+    Yield the elements of the JSON array at `prefix` one at a time, closing body
+    when done. `prefix` uses ijson's syntax: "jobs.item" for {"jobs": [...]},
+    plain "item" for a top-level array. A missing path yields nothing.
+    """
+    try:
+        if ijson is not None:
+            yield from ijson.items(body, prefix, use_float=True)
+            return
+        node = json.load(body)
+        for key in prefix.split(".")[:-1]:
+            node = node.get(key, {}) if isinstance(node, dict) else {}
+        yield from node or []
+    finally:
+        body.close()
+
+
+# The seen document nests the jobs and the site fingerprints side by side, so they
+# are always written together and vanish together:
+#   {"sites": {site: [job, ...]}, "fingerprints": {site: fingerprint}}
+# Older files are a flat {site: [job, ...]} map, read as having no fingerprints.
+def load_state() -> Tuple[Dict[str, List[Dict]], Dict[str, str]]:
+    """The seen jobs per site and the site fingerprints, read from DATA_FILE at once."""
     if DATA_FILE.exists():
         try:
             data = json.loads(DATA_FILE.read_text(encoding="utf-8"))
+            if isinstance(data, dict) and isinstance(data.get("sites"), dict):
+                fingerprints = data.get("fingerprints")
+                return data["sites"], fingerprints if isinstance(fingerprints, dict) else {}
             if isinstance(data, dict):
-                return data
+                return data, {}
         except Exception as ex:
             logger.warning(f"[State] Failed to read {DATA_FILE}; starting fresh {ex}")
-    return {}
+    return {}, {}
+
+
+def load_seen() -> Dict[str, List[Dict]]:
+    return load_state()[0]
+
 
-def save_seen(data: Dict[str, List[Dict]]) -> None:
-    DATA_FILE.write_text(json.dumps(data, indent=2, ensure_ascii=False))
-    logger.debug(f"Saved seen state to {DATA_FILE}")
+def save_state(seen: Dict[str, List[Dict]], fingerprints: Dict[str, str], path: Optional[Path] = None) -> None:
+    path = path or DATA_FILE
+    document = {"sites": seen, "fingerprints": fingerprints}
+    atomic_write_text(path, json.dumps(document, indent=2, ensure_ascii=False))
+    logger.debug(f"Saved seen state to {path}")
@@ -0,0 +1,126 @@
+"""
+Derived views of the seen state, built once per check and served as-is by the API.
+
+Every check produces the full jobs payload, the ranked top-jobs list (from the
+incrementally maintained backend.top_jobs index) and the stats counts. They are published to Redis together under a new version
+number, and readers always fetch views of the same version, so /jobs, /top_jobs and
+/stats never disagree or re-parse state on the request path.
+
+Each view is stored as a hash of ready-to-send representations: the encoded JSON
+body, a gzip copy (plus brotli when the package is installed) and a weak ETag
+derived from the body. Use a Redis client with decode_responses=False for these;
+the *_async readers take the equivalent redis.asyncio client.
+"""
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+import redis
+import redis.asyncio
+
+from backend.logger import logger
+from backend.top_jobs import TopJobsIndex
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+VIEWS_VERSION_KEY = "views:version"
+VIEWS_CURRENT_KEY = "views:current"
+VIEWS_GRACE_SECONDS = 5 * 60  # old versions linger this long for readers mid-request
+
+
+def view_key(version: int, name: str) -> str:
+    return f"views:{version}:{name}"
+
+
+def build_views(seen: Dict[str, List[Dict]], top_jobs: Optional[TopJobsIndex] = None) -> Dict[str, Any]:
+    """
+    Build every derived view from the seen state. `top_jobs` is an index already in
+    sync with `seen`; without one the top jobs are scored from scratch.
+    """
+    if top_jobs is None:
+        top_jobs = TopJobsIndex()
+        top_jobs.rebuild(seen)
+
+    return {
+        "jobs": seen,
+        "top_jobs": top_jobs.view(),
+        "stats": {
+            "total_jobs": sum(len(jobs_list) for jobs_list in seen.values()),
+            "companies": len(seen),
+            "sites": {site: len(jobs_list) for site, jobs_list in seen.items()},  # jobs per site
+        },
+    }
+
+
+def encode_view(value: Any) -> Dict[str, bytes]:
+    """Every representation of a view the API may send, keyed by content coding."""
+    body = json.dumps(value).encode("utf-8")
+    encoded = {
+        "etag": f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'.encode("ascii"),
+        "identity": body,
+        "gzip": gzip.compress(body, compresslevel=6),
+    }
+    if brotli is not None:
+        encoded["br"] = brotli.compress(body)
+    return encoded
+
+
+def publish_views(r: redis.Redis, views: Dict[str, Any]) -> int:
+    """Encode views once and switch readers to them atomically. Returns the new version."""
+    version = r.incr(VIEWS_VERSION_KEY)
+    previous = r.get(VIEWS_CURRENT_KEY)
+
+    pipe = r.pipeline(transaction=True)
+    for name, value in views.items():
+        pipe.hset(view_key(version, name), mapping=encode_view(value))
+    pipe.set(VIEWS_CURRENT_KEY, version)
+    if previous:
+        for name in views:
+            pipe.expire(view_key(int(previous), name), VIEWS_GRACE_SECONDS)
+    pipe.execute()
+
+    logger.debug(f"[Views] Published views version {version}")
+    return version
+
+
+def current_version(r: redis.Redis) -> Optional[int]:
+    version = r.get(VIEWS_CURRENT_KEY)
+    return int(version) if version else None
+
+
+def read_view(
+    r: redis.Redis, name: str, fields: Sequence[str], version: Optional[int] = None
+) -> Optional[List[Optional[bytes]]]:
+    """
+    The requested representations (e.g. "etag", "gzip") of view `name` at `version`
+    (default: the current one), or None if no such views are published.
+    """
+    version = version or current_version(r)
+    if not version:
+        return None
+    values = r.hmget(view_key(version, name), list(fields))
+    if all(v is None for v in values):
+        return None
+    return values
+
+
+async def current_version_async(r: redis.asyncio.Redis) -> Optional[int]:
+    version = await r.get(VIEWS_CURRENT_KEY)
+    return int(version) if version else None
+
+
+async def read_view_async(
+    r: redis.asyncio.Redis, name: str, fields: Sequence[str], version: Optional[int] = None
+) -> Optional[List[Optional[bytes]]]:
+    """read_view() for the API's async request path."""
+    version = version or await current_version_async(r)
+    if not version:
+        return None
+    values = await r.hmget(view_key(version, name), list(fields))
+    if all(v is None for v in values):
+        return None
+    return values
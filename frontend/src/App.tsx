@@ -5,6 +5,7 @@ import Navbar from "./components/Navbar";
 import JobsPage from "./pages/JobsPage";
 import LogsPage from "./pages/LogsPage";
 import HomePage from "./pages/HomePage";
+import { JobChanges } from "./api/changes";
 import "./theme.css";
 
 const queryClient = new QueryClient();
@@ -26,6 +27,7 @@ function App() {
 
   return (
     <QueryClientProvider client={queryClient}>
+      <JobChanges />
       <Router>
         <div className="flex h-screen overflow-hidden bg-[var(--bg-main)]">
           <Navbar darkMode={darkMode} setDarkMode={setDarkMode} />
@@ -2,18 +2,18 @@ import axios from "axios";
 
 const API_BASE = window.RUNTIME_CONFIG.API_URL;
 
-export async function fetchJobs() {
-  const res = await fetch(`${API_BASE}/jobs`);
-  if (!res.ok) throw new Error("Network response was not ok");
-  return res.json();
-}
-
 export async function fetchLogs(lines?: number) {
   const res = await fetch(`${API_BASE}/logs?lines=${lines ?? 500}`);
   if (!res.ok) throw new Error("Network response was not ok");
   return res.text(); // fetch as plain text
 }
 
+// Server-Sent Events: the last `lines` log lines, then new lines as they are written.
+// EventSource reconnects by itself and the server resumes from the last event id.
+export function streamLogs(lines?: number) {
+  return new EventSource(`${API_BASE}/logs/stream?lines=${lines ?? 500}`);
+}
+
 export async function fetchStats() {
   const res = await fetch(`${API_BASE}/stats`);
   if (!res.ok) throw new Error("Failed to fetch stats");
@@ -26,3 +26,31 @@ export async function fetchTopJobs() {
   return res.json();
 }
 
+
+export interface JobSearchParams {
+  site?: string;
+  category?: string;
+  location?: string;
+  title?: string;
+  keyword?: string;
+  sort?: string;
+  cursor?: string;
+  limit?: number;
+}
+
+export interface JobPage {
+  count: number;
+  jobs: Record<string, any>[];
+  next_cursor: string | null;
+}
+
+// One page of matching jobs; pass next_cursor back as `cursor` for the next one
+export async function searchJobs(params: JobSearchParams): Promise<JobPage> {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== "") query.set(key, String(value));
+  });
+  const res = await fetch(`${API_BASE}/jobs?${query.toString()}`);
+  if (!res.ok) throw new Error("Failed to search jobs");
+  return res.json();
+}
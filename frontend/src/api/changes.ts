@@ -0,0 +1,55 @@
+import { useEffect } from "react";
+import { QueryClient, useQueryClient } from "@tanstack/react-query";
+
+const API_BASE = window.RUNTIME_CONFIG.API_URL;
+
+type Job = Record<string, any>;
+
+interface SiteChanges {
+  added: Job[];
+  updated: Job[];
+  removed: string[]; // links
+}
+
+interface ChangesEvent {
+  version: number;
+  time: string;
+  stats: Record<string, any>;
+  sites: Record<string, SiteChanges>;
+}
+
+function onChanges(queryClient: QueryClient, event: ChangesEvent) {
+  queryClient.setQueryData(["stats"], event.stats); // includes the job count per site
+  if (Object.keys(event.sites).length === 0) return;
+  // Pages are cut from a numbered job list, so a changed company's open list
+  // restarts from its first page rather than patching pages in place
+  Object.keys(event.sites).forEach((site) =>
+    queryClient.invalidateQueries({ queryKey: ["jobsPage", site] })
+  );
+  queryClient.invalidateQueries({ queryKey: ["top_jobs"] }); // re-ranked server side
+}
+
+// Keeps the job list, stats and top-jobs queries current from the /changes SSE feed,
+// so pages don't need to poll. EventSource reconnects by itself and the server
+// replays missed events; a "reset" means too much was missed, so refetch all.
+export function useJobChanges() {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    const source = new EventSource(`${API_BASE}/changes`);
+    source.addEventListener("changes", (e) =>
+      onChanges(queryClient, JSON.parse((e as MessageEvent).data))
+    );
+    source.addEventListener("reset", () => {
+      ["jobsPage", "stats", "top_jobs"].forEach((key) =>
+        queryClient.invalidateQueries({ queryKey: [key] })
+      );
+    });
+    return () => source.close();
+  }, [queryClient]);
+}
+
+export function JobChanges() {
+  useJobChanges();
+  return null;
+}
@@ -1,5 +1,9 @@
 import { useState } from "react";
+import { useInfiniteQuery } from "@tanstack/react-query";
 import { ChevronDown } from "lucide-react";
+import { searchJobs } from "../api/api";
+
+const PAGE_SIZE = 50;
 
 interface Job {
   title: string;
@@ -11,11 +15,20 @@ interface Job {
 interface JobListProps {
   company: string;
   logo?: string;
-  jobs: Job[];
+  count: number;
 }
 
-export default function JobList({ company, logo, jobs }: JobListProps) {
+export default function JobList({ company, logo, count }: JobListProps) {
   const [isOpen, setIsOpen] = useState(false);
+  // Fetched only once the list is opened; the change feed refetches it when the company's jobs change
+  const { data, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
+    queryKey: ["jobsPage", company],
+    queryFn: ({ pageParam }) => searchJobs({ site: company, limit: PAGE_SIZE, cursor: pageParam }),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (last) => last.next_cursor ?? undefined,
+    enabled: isOpen,
+  });
+  const jobs = (data?.pages.flatMap((page) => page.jobs) ?? []) as Job[];
 
   return (
     <div className="mb-8 card rounded-2xl">
@@ -44,7 +57,7 @@ export default function JobList({ company, logo, jobs }: JobListProps) {
               color: "var(--text-secondary)",
             }}
           >
-            {jobs.length} {jobs.length === 1 ? "job" : "jobs"}
+            {count} {count === 1 ? "job" : "jobs"}
           </span>
           <ChevronDown
             className={`transition-transform duration-300 ${
@@ -61,7 +74,7 @@ export default function JobList({ company, logo, jobs }: JobListProps) {
       {/* Jobs Grid */}
       <div
         className={`grid grid-cols-1 sm:grid-cols-2 md:grid-cols-3 gap-4 transition-all duration-300 ${
-          isOpen ? "max-h-[2000px] opacity-100" : "max-h-0 opacity-0 overflow-hidden"
+          isOpen ? "opacity-100" : "max-h-0 opacity-0 overflow-hidden"
         }`}
       >
         {jobs.map((job, idx) => (
@@ -80,6 +93,19 @@ export default function JobList({ company, logo, jobs }: JobListProps) {
           </a>
         ))}
       </div>
+
+      {isOpen && hasNextPage && (
+        <div className="flex justify-center p-4">
+          <button
+            className="text-sm font-medium px-4 py-2 rounded-full"
+            style={{ backgroundColor: "var(--accent-light)", color: "var(--text-secondary)" }}
+            onClick={() => fetchNextPage()}
+            disabled={isFetchingNextPage}
+          >
+            {isFetchingNextPage ? "Loading..." : `Show more (${jobs.length} of ${count})`}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
@@ -11,8 +11,7 @@ interface TopJobsCardProps {
 export default function TopJobsCard({ darkMode }: TopJobsCardProps) {
   const { data, isLoading, error } = useQuery({
     queryKey: ["top_jobs"],
-    queryFn: fetchTopJobs,
-    refetchInterval: 30000,
+    queryFn: fetchTopJobs, // refetched by the change feed when jobs change
   });
 
   const LoadingOrError = (message: string) => (
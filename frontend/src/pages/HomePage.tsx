@@ -1,6 +1,6 @@
 import * as React from "react";
 import { useQuery } from "@tanstack/react-query";
-import { fetchJobs, fetchLogs, fetchStats } from "../api/api";
+import { fetchLogs, fetchStats } from "../api/api";
 import { PieChart } from "@mui/x-charts/PieChart";
 import { labelMarkClasses } from '@mui/x-charts/ChartsLabel';
 import { Briefcase, Building2, Clock, Activity, AlertTriangle, CheckCircle } from "lucide-react";
@@ -13,6 +13,7 @@ interface Stats {
   total_scrapes: number;
   scrape_durations_seconds: number;
   last_scrape: string;
+  sites?: Record<string, number>; // jobs per company
 }
 interface HomePageProps {
   darkMode: boolean;
@@ -21,11 +22,7 @@ interface HomePageProps {
 export default function HomePage({ darkMode }: HomePageProps) {
   const { data: stats } = useQuery<Stats>({
     queryKey: ["stats"],
-    queryFn: async () => {
-      await fetchJobs(); // trigger scrape
-      return fetchStats();
-    },
-    refetchInterval: 10000,
+    queryFn: fetchStats, // kept current by the change feed
   });
 
   const { data: logs } = useQuery({
@@ -34,11 +31,6 @@ export default function HomePage({ darkMode }: HomePageProps) {
     refetchInterval: 10000,
   });
 
-  const { data: jobsData } = useQuery<Record<string, any[]>>({
-    queryKey: ["jobsData"],
-    queryFn: fetchJobs,
-  });
-
   const totalJobs = stats?.total_jobs ?? 0;
   const totalCompanies = stats?.companies ?? 0;
   const totalScrapes = stats?.total_scrapes ?? 0;
@@ -49,11 +41,11 @@ export default function HomePage({ darkMode }: HomePageProps) {
   const errors = logText.match(/ERROR/g)?.length ?? 0;
 
   const pieData =
-    jobsData && Object.keys(jobsData).length > 0
-      ? Object.entries(jobsData).map(([company, jobs]) => ({
-          id: company,       // used internally
-          label: company,    // shows in tooltip
-          value: jobs.length // number of jobs
+    stats?.sites && Object.keys(stats.sites).length > 0
+      ? Object.entries(stats.sites).map(([company, count]) => ({
+          id: company,    // used internally
+          label: company, // shows in tooltip
+          value: count    // number of jobs
         }))
       : [];
 
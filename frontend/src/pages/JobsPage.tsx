@@ -1,5 +1,5 @@
 import { useQuery } from "@tanstack/react-query";
-import { fetchJobs } from "../api/api";
+import { fetchStats } from "../api/api";
 import JobList from "../components/JobList";
 import { Commet } from "react-loading-indicators";
 import { getCompanyLogo } from "../utils/logos";
@@ -9,10 +9,11 @@ interface JobsPageProps {
 }
 
 export default function JobsPage({ darkMode }: JobsPageProps) {
+  // Companies and their job counts come from the stats view; each list loads its
+  // jobs a page at a time from /jobs?site=... once it is opened
   const { data, isLoading, error } = useQuery({
-    queryKey: ["jobs"],
-    queryFn: fetchJobs,
-    refetchInterval: 900_000,
+    queryKey: ["stats"],
+    queryFn: fetchStats, // kept current by the change feed
   });
 
   if (isLoading)
@@ -26,13 +27,13 @@ export default function JobsPage({ darkMode }: JobsPageProps) {
 
   return (
     <div className="p-6">
-      {data &&
-        Object.entries(data).map(([company, jobs]) => (
+      {data?.sites &&
+        Object.entries(data.sites as Record<string, number>).map(([company, count]) => (
           <JobList
             key={company}
             company={company}
             logo={getCompanyLogo(company, darkMode)}
-            jobs={jobs as any[]}
+            count={count}
           />
         ))}
     </div>
@@ -1,32 +1,43 @@
-import { useQuery } from "@tanstack/react-query";
-import { fetchLogs } from "../api/api";
+import { useEffect, useState } from "react";
+import { streamLogs } from "../api/api";
 import LogViewer from "../components/LogViewer";
 import { BlinkBlur } from "react-loading-indicators";
 
+const MAX_LINES = 2000; // keep the page light when it stays open for days
+
 export default function LogsPage() {
-  const { data, isLoading, error } = useQuery({
-    queryKey: ["logs", 500],
-    queryFn: ({ queryKey }) => fetchLogs(queryKey[1] as number),
-    refetchInterval: 10000,
-  });
+  const [lines, setLines] = useState<string[] | null>(null);
+  const [error, setError] = useState<string | null>(null);
+
+  useEffect(() => {
+    const source = streamLogs(500);
+    source.onopen = () => {
+      setError(null);
+      setLines((prev) => prev ?? []);
+    };
+    source.onmessage = (event) => {
+      const incoming = event.data.split("\n").reverse(); // newest first
+      setLines((prev) => [...incoming, ...(prev ?? [])].slice(0, MAX_LINES));
+    };
+    source.onerror = () => setError("Lost connection to the log stream; reconnecting...");
+    return () => source.close();
+  }, []);
 
-  if (isLoading)
+  if (lines === null && !error)
     return (
       <div className="flex justify-center items-center h-full min-h-[60vh]">
         <BlinkBlur color="var(--accent-primary)" size="large" />
       </div>
     );
-  if (error) return <div>Error loading logs: {(error as Error).message}</div>;
-
-  const lines = data?.split("\n").reverse() ?? [];
+  if (lines === null) return <div>Error loading logs: {error}</div>;
 
   return (
     <div className="flex flex-col flex-1 h-full"> {/* take all available space */}
       <div className="card flex flex-col flex-1 overflow-hidden p-6">
         <h2 className="text-xl font-semibold mb-4">Logs</h2>
+        {error && <p className="text-sm mb-2" style={{ color: "var(--log-text-alert)" }}>{error}</p>}
         <LogViewer logs={lines} />
       </div>
     </div>
   );
 }
-